@@ -14,23 +14,27 @@ import sys
 import fcntl
 import time
 import math
+import bisect
 import threading
 import logging
 import queue
 import json
 import socket
 import signal
+import struct
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
 from enum import IntEnum
-from typing import Optional, Tuple
+from typing import Tuple
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QSlider, QLabel, QComboBox, QGroupBox, QGridLayout,
     QMessageBox, QPlainTextEdit, QDockWidget, QCheckBox, QFrame, QLineEdit
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject, QSettings, QPointF, QSize, QThread
-from PyQt6.QtGui import QColor, QPalette, QPainter, QConicalGradient, QRadialGradient, QPen, QDoubleValidator
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot, QObject, QSettings, QPointF, QSize, QThread, QSocketNotifier
+from PyQt6.QtGui import QColor, QPalette, QPainter, QConicalGradient, QRadialGradient, QPen, QDoubleValidator, QPixmap
 
 # --- HID Constants ---
 class HIDReport(IntEnum):
@@ -53,6 +57,23 @@ WATCHDOG_INTERVAL_SEC = 0.5
 WATCHDOG_STALL_THRESHOLD_SEC = 2.0
 PID_FILE = Path.home() / ".config" / "kbdrgb" / "app.pid"
 SOCKET_FILE = Path.home() / ".config" / "kbdrgb" / "app.sock"
+IPC_MAX_MESSAGE = 512  # IPC commands are tiny JSON objects, one per datagram
+DEVICE_CHECK_TTL_SEC = 2.0
+AUTONOMOUS_DISABLE_TTL_SEC = 2.0  # live updates skip re-disabling within this window
+SETTINGS_FLUSH_DELAY_MS = 500  # sync QSettings once edits have settled
+LIVE_COLOR_INTERVAL_MS = 40  # max rate of live HID updates while dragging
+
+# (key, default, type) of every persisted setting, read once at startup
+SETTINGS_DEFAULTS = (
+    ("device_path", DEFAULT_DEVICE_PATH, str),
+    ("color_r", 0, int),
+    ("color_g", 0, int),
+    ("color_b", 255, int),
+    ("intensity", 255, int),
+    ("last_style", "Static", str),
+    ("speed_interval", 0.5, float),
+    ("user_presets_json", "[]", str),
+)
 
 # --- Logging (thread-safe queue -> GUI console) ---
 log_queue = queue.Queue(maxsize=10000)
@@ -82,6 +103,28 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 
 # --- HID helpers ---
+_device_exists_cache = {}  # dev_path -> (checked_at, exists)
+_last_disable = {}  # dev_path -> monotonic time of last successful DISABLE_AUTONOMOUS
+
+def device_exists(dev_path: str) -> bool:
+    """Check that the device node exists, caching the result for DEVICE_CHECK_TTL_SEC"""
+    now = time.monotonic()
+    cached = _device_exists_cache.get(dev_path)
+    if cached is not None and now - cached[0] < DEVICE_CHECK_TTL_SEC:
+        return cached[1]
+    exists = bool(dev_path) and os.path.exists(dev_path)
+    _device_exists_cache[dev_path] = (now, exists)
+    return exists
+
+def invalidate_device_cache(dev_path: str = None):
+    """Force the next device_exists() call to re-stat (all paths if None)"""
+    if dev_path is None:
+        _device_exists_cache.clear()
+        _last_disable.clear()
+    else:
+        _device_exists_cache.pop(dev_path, None)
+        _last_disable.pop(dev_path, None)
+
 def HIDIOCSFEATURE(length):
     """Calculate IOCTL command for HID feature report"""
     return HIDConstants.IOCTL_BASE | (length << 16)
@@ -91,7 +134,7 @@ def send_feature_report(dev_path: str, report_id: int, data: list) -> bool:
     Send HID feature report to device
     Returns True on success, False on failure
     """
-    if not dev_path or not os.path.exists(dev_path):
+    if not dev_path:
         logger.error(f"Device path invalid or doesn't exist: {dev_path}")
         return False
 
@@ -99,7 +142,13 @@ def send_feature_report(dev_path: str, report_id: int, data: list) -> bool:
     start = time.monotonic()
     fd = None
     try:
-        fd = os.open(dev_path, os.O_RDWR)
+        # No exists() preflight: the open itself reports a missing or inaccessible node
+        try:
+            fd = os.open(dev_path, os.O_RDWR)
+        except (FileNotFoundError, PermissionError) as e:
+            logger.error(f"Device path invalid or doesn't exist: {dev_path} ({e})")
+            invalidate_device_cache(dev_path)
+            return False
         fcntl.ioctl(fd, HIDIOCSFEATURE(len(full_packet)), full_packet)
         elapsed = (time.monotonic() - start) * 1000
         logger.debug(f"HID report sent (id=0x{report_id:02X}, len={len(full_packet)}), {elapsed:.1f} ms")
@@ -107,6 +156,7 @@ def send_feature_report(dev_path: str, report_id: int, data: list) -> bool:
     except OSError as e:
         elapsed = (time.monotonic() - start) * 1000
         logger.error(f"HID Error on id=0x{report_id:02X} after {elapsed:.1f} ms: {e}")
+        invalidate_device_cache(dev_path)
         return False
     finally:
         if fd is not None:
@@ -115,10 +165,18 @@ def send_feature_report(dev_path: str, report_id: int, data: list) -> bool:
             except OSError:
                 pass
 
-def disable_autonomous(dev_path: str) -> bool:
-    """Disable autonomous lighting mode"""
+def disable_autonomous(dev_path: str, force: bool = True) -> bool:
+    """
+    Disable autonomous lighting mode
+    With force=False the report (and its settle sleep) is skipped if it
+    already succeeded within AUTONOMOUS_DISABLE_TTL_SEC
+    """
+    now = time.monotonic()
+    if not force and now - _last_disable.get(dev_path, -AUTONOMOUS_DISABLE_TTL_SEC) < AUTONOMOUS_DISABLE_TTL_SEC:
+        return True
     if send_feature_report(dev_path, HIDReport.DISABLE_AUTONOMOUS, [0x00]):
         time.sleep(0.01)
+        _last_disable[dev_path] = time.monotonic()
         return True
     return False
 
@@ -136,14 +194,63 @@ def set_color(dev_path: str, r: int, g: int, b: int, i: int,
     b = max(0, min(255, int(b)))
     i = max(0, min(HIDConstants.MAX_INTENSITY, int(i)))
 
-    payload = [
-        0x01,
-        start_id & 0xFF, (start_id >> 8) & 0xFF,
-        end_id & 0xFF, (end_id >> 8) & 0xFF,
-        r, g, b, i
-    ]
+    return set_color_trusted(dev_path, r, g, b, i, start_id, end_id)
+
+# SET_COLOR payload: 0x01, start_id (LE16), end_id (LE16), r, g, b, i
+_SET_COLOR_PAYLOAD = struct.Struct("<BHHBBBB")
+
+def set_color_trusted(dev_path: str, r: int, g: int, b: int, i: int,
+                      start_id: int = HIDConstants.DEFAULT_LED_START,
+                      end_id: int = HIDConstants.DEFAULT_LED_END) -> bool:
+    """
+    Set LED color without clamping.
+    Callers must pass ints already in 0..255 (animation loops, LUT values).
+    """
+    payload = _SET_COLOR_PAYLOAD.pack(0x01, start_id, end_id, r, g, b, i)
     return send_feature_report(dev_path, HIDReport.SET_COLOR, payload)
 
+# --- Segment spans ---
+LEDS_PER_SEGMENT = 5
+SPAN_INTENSITY_QUANTUM = 8  # ~3% brightness, imperceptible
+
+def coalesce_spans(frame, quantum: int = SPAN_INTENSITY_QUANTUM):
+    """
+    Merge adjacent segments that share a color into LED ranges.
+    frame is a list of (r, g, b, i) per segment; intensity is rounded to the
+    nearest multiple of quantum before comparing.
+    Returns a list of (start_id, end_id, r, g, b, i).
+    """
+    spans = []
+    for seg, (r, g, b, i) in enumerate(frame):
+        i = min(255, (i + quantum // 2) // quantum * quantum)
+        start_id = seg * LEDS_PER_SEGMENT
+        end_id = start_id + LEDS_PER_SEGMENT - 1
+        if spans and spans[-1][2:] == (r, g, b, i):
+            spans[-1] = (spans[-1][0], end_id, r, g, b, i)
+        else:
+            spans.append((start_id, end_id, r, g, b, i))
+    return spans
+
+def make_color_writer(dev_path: str):
+    """
+    Build a set_color_trusted bound to one device for an animation thread.
+    Globals and IntEnum lookups are resolved once, so the returned closure
+    only touches locals on each frame.
+    """
+    send = send_feature_report
+    pack = _SET_COLOR_PAYLOAD.pack
+    report_id = int(HIDReport.SET_COLOR)
+
+    def write(r, g, b, i,
+              start_id=HIDConstants.DEFAULT_LED_START, end_id=HIDConstants.DEFAULT_LED_END):
+        return send(dev_path, report_id, pack(0x01, start_id, end_id, r, g, b, i))
+    return write
+
+def set_frame(write, frame) -> None:
+    """Send a per-segment frame through write() as one report per coalesced span"""
+    for start_id, end_id, r, g, b, i in coalesce_spans(frame):
+        write(r, g, b, i, start_id, end_id)
+
 # --- Presets & Styles ---
 PRESETS = {
     "Red": (255, 0, 0, 255),
@@ -159,6 +266,9 @@ PRESETS = {
     "Off": (0, 0, 0, 0),
 }
 
+# Number of pre-drawn ripple keystrokes (power of two, cycled)
+RIPPLE_EVENT_QUEUE_SIZE = 8192
+
 STYLES = [
     "Static",
     "Breathing",
@@ -173,6 +283,16 @@ STYLES = [
 ]
 
 # --- ColorWheel (live HSV wheel) ---
+# (R', G', B') for each 60° hue sector, given chroma C and second component X
+_HSV_SECTORS = (
+    lambda c, x: (c, x, 0),
+    lambda c, x: (x, c, 0),
+    lambda c, x: (0, c, x),
+    lambda c, x: (0, x, c),
+    lambda c, x: (x, 0, c),
+    lambda c, x: (c, 0, x),
+)
+
 class ColorWheel(QFrame):
     colorChanged = pyqtSignal(int, int, int)  # r,g,b
 
@@ -185,6 +305,8 @@ class ColorWheel(QFrame):
         self.s = 0.0       # saturation 0..1
         self.v = 1.0       # value 0..1
         self.dragging = False  # Track whether user is dragging
+        self._wheel_pixmap = None  # Cached rendered wheel
+        self._wheel_key = None     # (radius, v) the cached wheel was rendered for
         self.setCursor(Qt.CursorShape.CrossCursor)
 
     def sizeHint(self):
@@ -201,17 +323,8 @@ class ColorWheel(QFrame):
         cx, cy = rect.center().x(), rect.center().y()
         radius = min(rect.width(), rect.height()) // 2 - 10
 
-        # Create rainbow gradient wheel - simple conical gradient
-        hue_grad = QConicalGradient(QPointF(cx, cy), 90)  # Start at top (red)
-        for i in range(360):
-            hue = i / 360.0
-            # Apply current brightness to the gradient
-            hue_grad.setColorAt(hue, QColor.fromHsvF(hue, 1.0, self.v))
-
-        # Draw the gradient circle
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.setBrush(hue_grad)
-        painter.drawEllipse(QPointF(cx, cy), radius, radius)
+        # Draw the gradient circle (re-rendered only on resize or brightness change)
+        painter.drawPixmap(cx - radius, cy - radius, self._renderWheel(radius))
 
         # Draw selection indicator at current hue position
         # Add pi/2 to align with QConicalGradient starting at 90° (top)
@@ -228,6 +341,36 @@ class ColorWheel(QFrame):
         painter.setBrush(Qt.BrushStyle.NoBrush)
         painter.drawEllipse(QPointF(ind_x, ind_y), 12, 12)
 
+    def _renderWheel(self, radius):
+        dpr = self.devicePixelRatioF()
+        key = (radius, dpr, self.v)
+        if self._wheel_key == key:
+            return self._wheel_pixmap
+
+        # Allocate in device pixels so HiDPI screens get a sharp wheel; painting stays in logical units
+        size = 2 * radius
+        pixmap = QPixmap(round(size * dpr), round(size * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Create rainbow gradient wheel - simple conical gradient
+        hue_grad = QConicalGradient(QPointF(radius, radius), 90)  # Start at top (red)
+        for i in range(360):
+            hue = i / 360.0
+            # Apply current brightness to the gradient
+            hue_grad.setColorAt(hue, QColor.fromHsvF(hue, 1.0, self.v))
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(hue_grad)
+        painter.drawEllipse(QPointF(radius, radius), radius, radius)
+        painter.end()
+
+        self._wheel_pixmap = pixmap
+        self._wheel_key = key
+        return pixmap
+
     def mousePressEvent(self, e):
         self.dragging = True
         self._updateFromMouse(e, emit_signal=False)
@@ -274,12 +417,20 @@ class ColorWheel(QFrame):
         self.update()
 
     def _emitColor(self):
-        c = QColor.fromHsvF(self.h, self.s, self.v)
-        self.colorChanged.emit(c.red(), c.green(), c.blue())
+        # Direct HSV -> RGB, avoids allocating a QColor per drag event
+        c = self.v * self.s
+        h6 = (self.h % 1.0) * 6
+        x = c * (1 - abs((h6 % 2) - 1))
+        m = self.v - c
+        rp, gp, bp = _HSV_SECTORS[int(h6) % 6](c, x)
+        self.colorChanged.emit(int((rp + m) * 255 + 0.5),
+                               int((gp + m) * 255 + 0.5),
+                               int((bp + m) * 255 + 0.5))
 
 # --- Animations ---
 def breathing(dev_path, base_color, interval, stop_event):
     logger.info(f"[breathing] start, period={interval}s, base={base_color}")
+    write = make_color_writer(dev_path)
     r, g, b = base_color
     updates_per_cycle = max(90, int(120 * interval))
 
@@ -296,12 +447,14 @@ def breathing(dev_path, base_color, interval, stop_event):
                     return
                 phase = (2 * math.pi) * (k / updates_per_cycle)
                 intensity = int(((1 - math.cos(phase)) * 0.5) * 255)
-                if not set_color(dev_path, r, g, b, intensity):
+                if not write(r, g, b, intensity):
                     logger.error("[breathing] HID command failed")
                     return
                 target = t0 + (k + 1) * (interval / updates_per_cycle)
                 sleep = max(0.0, target - time.monotonic())
-                time.sleep(sleep)
+                if stop_event.wait(sleep):
+                    logger.info("[breathing] stop requested")
+                    return
             t0 = time.monotonic()
     except Exception as e:
         logger.exception(f"[breathing] unexpected error: {e}")
@@ -310,24 +463,32 @@ def breathing(dev_path, base_color, interval, stop_event):
 
 def rainbow(dev_path, interval, stop_event):
     logger.info(f"[rainbow] start, interval={interval}s")
+    write = make_color_writer(dev_path)
     steps = 180
+    # Loop invariants: per-step angle increment and the G/B phase offsets
+    two_pi = 2 * math.pi
+    angle_step = two_pi / steps
+    phase_g = two_pi / 3
+    phase_b = 2 * two_pi / 3
+    sin = math.sin
     try:
         if not disable_autonomous(dev_path):
             logger.error("[rainbow] failed to disable autonomous mode")
             return
         while not stop_event.is_set():
+            angle = 0.0
             for k in range(steps):
                 if stop_event.is_set():
                     logger.info("[rainbow] stop requested")
                     return
-                hue = k / steps
-                phase_g = 2 * math.pi / 3
-                phase_b = 4 * math.pi / 3
-                r = int(255 * (math.sin(2 * math.pi * hue) * 0.5 + 0.5))
-                g = int(255 * (math.sin(2 * math.pi * hue + phase_g) * 0.5 + 0.5))
-                b = int(255 * (math.sin(2 * math.pi * hue + phase_b) * 0.5 + 0.5))
-                set_color(dev_path, r, g, b, 255)
-                time.sleep(interval)
+                r = int(255 * (sin(angle) * 0.5 + 0.5))
+                g = int(255 * (sin(angle + phase_g) * 0.5 + 0.5))
+                b = int(255 * (sin(angle + phase_b) * 0.5 + 0.5))
+                angle += angle_step
+                write(r, g, b, 255)
+                if stop_event.wait(interval):
+                    logger.info("[rainbow] stop requested")
+                    return
     except Exception as e:
         logger.exception(f"[rainbow] unexpected error: {e}")
     finally:
@@ -335,19 +496,21 @@ def rainbow(dev_path, interval, stop_event):
 
 def flash(dev_path, base_color, interval, stop_event):
     logger.info(f"[flash] start, interval={interval}s, base={base_color}")
+    write = make_color_writer(dev_path)
     r, g, b = base_color
     try:
         if not disable_autonomous(dev_path):
             logger.error("[flash] failed to disable autonomous mode")
             return
         while not stop_event.is_set():
-            set_color(dev_path, r, g, b, 255)
-            time.sleep(interval)
-            if stop_event.is_set():
+            write(r, g, b, 255)
+            if stop_event.wait(interval):
+                logger.info("[flash] stop requested")
+                return
+            write(0, 0, 0, 0)
+            if stop_event.wait(interval):
                 logger.info("[flash] stop requested")
                 return
-            set_color(dev_path, 0, 0, 0, 0)
-            time.sleep(interval)
     except Exception as e:
         logger.exception(f"[flash] unexpected error: {e}")
     finally:
@@ -355,19 +518,21 @@ def flash(dev_path, base_color, interval, stop_event):
 
 def pulse(dev_path, base_color, interval, stop_event):
     logger.info(f"[pulse] start, interval={interval}s, base={base_color}")
+    write = make_color_writer(dev_path)
     r, g, b = base_color
     try:
         if not disable_autonomous(dev_path):
             logger.error("[pulse] failed to disable autonomous mode")
             return
         while not stop_event.is_set():
-            set_color(dev_path, r, g, b, 255)
-            time.sleep(max(0.01, interval/2))
-            if stop_event.is_set():
+            write(r, g, b, 255)
+            if stop_event.wait(max(0.01, interval/2)):
+                logger.info("[pulse] stop requested")
+                return
+            write(r, g, b, 64)
+            if stop_event.wait(max(0.01, interval/2)):
                 logger.info("[pulse] stop requested")
                 return
-            set_color(dev_path, r, g, b, 64)
-            time.sleep(max(0.01, interval/2))
     except Exception as e:
         logger.exception(f"[pulse] unexpected error: {e}")
     finally:
@@ -375,6 +540,7 @@ def pulse(dev_path, base_color, interval, stop_event):
 
 def wave(dev_path, base_color, interval, stop_event):
     logger.info(f"[wave] start, interval={interval}s, base={base_color}")
+    write = make_color_writer(dev_path)
     r, g, b = base_color
     leds = 20
     try:
@@ -386,10 +552,12 @@ def wave(dev_path, base_color, interval, stop_event):
                 if stop_event.is_set():
                     logger.info("[wave] stop requested")
                     return
-                for seg in range(leds):
-                    intensity = int((math.sin((seg+offset)/leds * math.pi) ** 2) * 255)
-                    set_color(dev_path, r, g, b, intensity, seg*5, seg*5+4)
-                time.sleep(interval)
+                frame = [(r, g, b, int((math.sin((seg+offset)/leds * math.pi) ** 2) * 255))
+                         for seg in range(leds)]
+                set_frame(write, frame)
+                if stop_event.wait(interval):
+                    logger.info("[wave] stop requested")
+                    return
     except Exception as e:
         logger.exception(f"[wave] unexpected error: {e}")
     finally:
@@ -397,6 +565,7 @@ def wave(dev_path, base_color, interval, stop_event):
 
 def spectrum(dev_path, interval, stop_event):
     logger.info(f"[spectrum] start, interval={interval}s")
+    write = make_color_writer(dev_path)
     leds = 20
     try:
         if not disable_autonomous(dev_path):
@@ -407,6 +576,7 @@ def spectrum(dev_path, interval, stop_event):
                 if stop_event.is_set():
                     logger.info("[spectrum] stop requested")
                     return
+                frame = []
                 for seg in range(leds):
                     hue = (seg + offset) / leds
                     phase_g = 2 * math.pi / 3
@@ -414,8 +584,11 @@ def spectrum(dev_path, interval, stop_event):
                     r = int(255 * (math.sin(2 * math.pi * hue) * 0.5 + 0.5))
                     g = int(255 * (math.sin(2 * math.pi * hue + phase_g) * 0.5 + 0.5))
                     b = int(255 * (math.sin(2 * math.pi * hue + phase_b) * 0.5 + 0.5))
-                    set_color(dev_path, r, g, b, 255, seg*5, seg*5+4)
-                time.sleep(interval)
+                    frame.append((r, g, b, 255))
+                set_frame(write, frame)
+                if stop_event.wait(interval):
+                    logger.info("[spectrum] stop requested")
+                    return
     except Exception as e:
         logger.exception(f"[spectrum] unexpected error: {e}")
     finally:
@@ -423,6 +596,7 @@ def spectrum(dev_path, interval, stop_event):
 
 def fade(dev_path, base_color, interval, stop_event, target=(255, 255, 255)):
     logger.info(f"[fade] start, interval={interval}s, base={base_color}, target={target}")
+    write = make_color_writer(dev_path)
     r1, g1, b1 = base_color
     r2, g2, b2 = target
     steps = max(60, int(120 * interval))
@@ -439,8 +613,10 @@ def fade(dev_path, base_color, interval, stop_event, target=(255, 255, 255)):
                 r = int(r1 + (r2 - r1) * t)
                 g = int(g1 + (g2 - g1) * t)
                 b = int(b1 + (b2 - b1) * t)
-                set_color(dev_path, r, g, b, 255)
-                time.sleep(interval / steps)
+                write(r, g, b, 255)
+                if stop_event.wait(interval / steps):
+                    logger.info("[fade] stop requested")
+                    return
     except Exception as e:
         logger.exception(f"[fade] unexpected error: {e}")
     finally:
@@ -448,6 +624,7 @@ def fade(dev_path, base_color, interval, stop_event, target=(255, 255, 255)):
 
 def strobe(dev_path, base_color, interval, stop_event):
     logger.info(f"[strobe] start, interval={interval}s, base={base_color}")
+    write = make_color_writer(dev_path)
     r, g, b = base_color
     on_time = max(0.005, interval / 4)
     off_time = on_time
@@ -456,13 +633,14 @@ def strobe(dev_path, base_color, interval, stop_event):
             logger.error("[strobe] failed to disable autonomous mode")
             return
         while not stop_event.is_set():
-            set_color(dev_path, r, g, b, 255)
-            time.sleep(on_time)
-            if stop_event.is_set():
+            write(r, g, b, 255)
+            if stop_event.wait(on_time):
+                logger.info("[strobe] stop requested")
+                return
+            write(0, 0, 0, 0)
+            if stop_event.wait(off_time):
                 logger.info("[strobe] stop requested")
                 return
-            set_color(dev_path, 0, 0, 0, 0)
-            time.sleep(off_time)
     except Exception as e:
         logger.exception(f"[strobe] unexpected error: {e}")
     finally:
@@ -474,6 +652,7 @@ def ripple(dev_path, base_color, interval, stop_event):
     Each ripple: 20% -> spike up 5% -> gradually fade back to 20%
     """
     logger.info(f"[ripple] start, base={base_color}, simulating keystroke ripples")
+    write = make_color_writer(dev_path)
     r, g, b = base_color
     leds = 20
     base_intensity = int(0.20 * 255)  # 20% baseline
@@ -481,6 +660,15 @@ def ripple(dev_path, base_color, interval, stop_event):
 
     import random
 
+    # Pre-drawn random draws: keystroke LEDs, and the per-tick threshold that was
+    # random.uniform(0.1, 0.5) on every tick (a fresh one each tick keeps the same ripple rate)
+    keystroke_leds = random.choices(range(leds), k=RIPPLE_EVENT_QUEUE_SIZE)
+    keystroke_dts = [random.uniform(0.1, 0.5) for _ in range(RIPPLE_EVENT_QUEUE_SIZE)]
+    event_idx = 0
+    tick_idx = 0
+    # Boost by distance from the keystroke LED (0, 1, 2)
+    boost_kernel = (ripple_boost, ripple_boost // 2, ripple_boost // 3)
+
     # Track intensity per LED segment
     led_intensities = [base_intensity] * leds
 
@@ -490,21 +678,21 @@ def ripple(dev_path, base_color, interval, stop_event):
             return
 
         # Set initial baseline (20%)
-        for seg in range(leds):
-            set_color(dev_path, r, g, b, base_intensity, seg*5, seg*5+4)
+        set_frame(write, [(r, g, b, base_intensity)] * leds)
 
         ripple_timer = 0
         while not stop_event.is_set():
-            # Randomly trigger "keystrokes" (ripples)
+            # Trigger "keystrokes" (ripples) from the pre-drawn draws
             ripple_timer += interval
-            if ripple_timer >= random.uniform(0.1, 0.5):  # Random keystroke frequency
+            threshold = keystroke_dts[tick_idx]
+            tick_idx = (tick_idx + 1) & (RIPPLE_EVENT_QUEUE_SIZE - 1)
+            if ripple_timer >= threshold:
                 ripple_timer = 0
-                # Pick random LED to "keystroke"
-                keystroke_led = random.randint(0, leds - 1)
+                keystroke_led = keystroke_leds[event_idx]
+                event_idx = (event_idx + 1) & (RIPPLE_EVENT_QUEUE_SIZE - 1)
                 # Boost that LED and neighbors
                 for i in range(max(0, keystroke_led - 2), min(leds, keystroke_led + 3)):
-                    distance = abs(i - keystroke_led)
-                    boost = ripple_boost // (distance + 1)
+                    boost = boost_kernel[abs(i - keystroke_led)]
                     led_intensities[i] = min(255, led_intensities[i] + boost)
 
             # Decay all LEDs back toward baseline
@@ -512,13 +700,15 @@ def ripple(dev_path, base_color, interval, stop_event):
                 if led_intensities[seg] > base_intensity:
                     # Gradual decay
                     led_intensities[seg] = max(base_intensity, led_intensities[seg] - 2)
-                set_color(dev_path, r, g, b, led_intensities[seg], seg*5, seg*5+4)
+            set_frame(write, [(r, g, b, i) for i in led_intensities])
 
             if stop_event.is_set():
                 logger.info("[ripple] stop requested")
                 return
 
-            time.sleep(interval)
+            if stop_event.wait(interval):
+                logger.info("[ripple] stop requested")
+                return
     except Exception as e:
         logger.exception(f"[ripple] unexpected error: {e}")
     finally:
@@ -526,68 +716,92 @@ def ripple(dev_path, base_color, interval, stop_event):
 
 # --- Animation Controller ---
 class AnimationController(QObject):
+    """
+    Runs animations on one long-lived worker thread fed by a command queue.
+    Each job carries its own stop event, so starting a new style only signals
+    the old job and enqueues; the UI thread never joins.
+    """
     thread_state = pyqtSignal(str)
 
     def __init__(self, get_device_path_callable):
         super().__init__()
-        self.thread: Optional[threading.Thread] = None
-        self.stop_event = threading.Event()
+        self.stop_event = threading.Event()  # stop flag of the most recent job
+        self.stop_event.set()
         self._get_device_path = get_device_path_callable
+        self._cmd_q = queue.SimpleQueue()
+        # Non-daemon worker so animations continue after GUI closes
+        self._worker = threading.Thread(target=self._run, daemon=False, name="Anim")
+        self._worker.start()
+
+    def _run(self):
+        while True:
+            job = self._cmd_q.get()
+            if job is None:
+                return
+            style, func, stop_event = job
+            if stop_event.is_set():
+                continue  # superseded before it started
+            if style != "static":
+                self.thread_state.emit("thread_started")
+            try:
+                func()
+            except Exception as e:
+                logger.exception(f"Animation job '{style}' failed: {e}")
+            finally:
+                stop_event.set()
+            self.thread_state.emit("static_applied" if style == "static" else "thread_stopped")
+
+    def is_running(self) -> bool:
+        """True while the most recent job is queued or running"""
+        return not self.stop_event.is_set()
 
     def start(self, style: str, base_color: Tuple[int, int, int], interval: float):
         self.stop()
-        self.stop_event.clear()
 
         style_lower = style.lower()
         dev_path = self._get_device_path()
 
-        if not dev_path or not os.path.exists(dev_path):
+        if not device_exists(dev_path):
             logger.error(f"Device not available: {dev_path}")
             self.thread_state.emit("device_unavailable")
             return
 
         logger.info(f"Animator start: style={style_lower}, base={base_color}, interval={interval}s")
 
+        stop_event = threading.Event()
         if style_lower == "static":
-            disable_autonomous(dev_path)
-            set_color(dev_path, *base_color, 255)
-            self.thread_state.emit("static_applied")
-            return
-
-        style_funcs = {
-            "breathing": lambda: breathing(dev_path, base_color, interval, self.stop_event),
-            "rainbow":   lambda: rainbow(dev_path, interval, self.stop_event),
-            "flash":     lambda: flash(dev_path, base_color, interval, self.stop_event),
-            "pulse":     lambda: pulse(dev_path, base_color, interval, self.stop_event),
-            "wave":      lambda: wave(dev_path, base_color, interval, self.stop_event),
-            "spectrum":  lambda: spectrum(dev_path, interval, self.stop_event),
-            "fade":      lambda: fade(dev_path, base_color, interval, self.stop_event),
-            "strobe":    lambda: strobe(dev_path, base_color, interval, self.stop_event),
-            "ripple":    lambda: ripple(dev_path, base_color, interval, self.stop_event),
-        }
-
-        if style_lower in style_funcs:
-            # Non-daemon thread so it continues after GUI closes
-            self.thread = threading.Thread(target=style_funcs[style_lower], daemon=False, name=f"Anim-{style_lower}")
-            self.thread.start()
-            self.thread_state.emit("thread_started")
+            def func():
+                disable_autonomous(dev_path)
+                set_color(dev_path, *base_color, 255)
         else:
-            logger.warning(f"Unknown style: {style_lower}")
+            style_funcs = {
+                "breathing": lambda: breathing(dev_path, base_color, interval, stop_event),
+                "rainbow":   lambda: rainbow(dev_path, interval, stop_event),
+                "flash":     lambda: flash(dev_path, base_color, interval, stop_event),
+                "pulse":     lambda: pulse(dev_path, base_color, interval, stop_event),
+                "wave":      lambda: wave(dev_path, base_color, interval, stop_event),
+                "spectrum":  lambda: spectrum(dev_path, interval, stop_event),
+                "fade":      lambda: fade(dev_path, base_color, interval, stop_event),
+                "strobe":    lambda: strobe(dev_path, base_color, interval, stop_event),
+                "ripple":    lambda: ripple(dev_path, base_color, interval, stop_event),
+            }
+            if style_lower not in style_funcs:
+                logger.warning(f"Unknown style: {style_lower}")
+                return
+            func = style_funcs[style_lower]
+
+        self.stop_event = stop_event
+        self._cmd_q.put((style_lower, func, stop_event))
 
     def stop(self):
-        if self.thread and self.thread.is_alive():
+        """Signal the current job to stop; returns immediately"""
+        if not self.stop_event.is_set():
             logger.info("Animator stop requested")
             self.stop_event.set()
-            start = time.monotonic()
-            self.thread.join(timeout=2.0)
-            elapsed = time.monotonic() - start
-            if self.thread.is_alive():
-                logger.warning(f"Animation thread '{self.thread.name}' did not stop in {elapsed:.2f}s (possible hung thread)")
-                self.thread_state.emit("thread_timeout")
-            else:
-                logger.info(f"Animation thread stopped in {elapsed:.2f}s")
-                self.thread_state.emit("thread_stopped")
-        self.thread = None
+
+    def shutdown(self):
+        """Let the worker thread exit once the current job has finished"""
+        self._cmd_q.put(None)
 
 # --- Log console widget ---
 class LogConsole(QDockWidget):
@@ -629,15 +843,22 @@ class IPCListener(QThread):
         # Create directory if needed
         SOCKET_FILE.parent.mkdir(parents=True, exist_ok=True)
 
-        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # SOCK_SEQPACKET keeps message boundaries: one recv() is one command
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8192)
         server.bind(str(SOCKET_FILE))
         server.listen(1)
         
+        creds = struct.Struct("3i")  # struct ucred: pid, uid, gid
         while True:
             try:
                 conn, _ = server.accept()
                 with conn:
-                    data = conn.recv(4096)
+                    _, uid, _ = creds.unpack(conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, creds.size))
+                    if uid != os.getuid():
+                        logger.warning(f"Rejected IPC connection from uid {uid}")
+                        continue
+                    data = conn.recv(IPC_MAX_MESSAGE)
                     if data:
                         try:
                             msg = json.loads(data.decode('utf-8'))
@@ -650,6 +871,11 @@ class IPCListener(QThread):
 
 # --- Main Window ---
 class KeyboardLightingWindow(QMainWindow):
+    # Speed slider has 101 positions: interval for each, and the ascending interval
+    # at which the slider rounds from v+1 down to v (log-space midpoints)
+    _SLIDER_TO_INTERVAL = tuple(max(0.01, min(30.0, 10.0 ** (1.0 - 0.03 * v))) for v in range(101))
+    _SLIDER_BOUNDS = tuple(sorted(10.0 ** (1.0 - 0.03 * (v + 0.5)) for v in range(100)))
+
     def __init__(self):
         super().__init__()
 
@@ -663,41 +889,57 @@ class KeyboardLightingWindow(QMainWindow):
         self.ipc_listener.command_received.connect(self.handle_ipc_command)
         self.ipc_listener.start()
 
-        # Set up signal handlers for clean shutdown using Qt's mechanism
-        import signal as sig_module
-        for sig in [sig_module.SIGTERM, sig_module.SIGINT]:
-            sig_module.signal(sig, lambda s, f: QApplication.instance().quit())
+        # Route SIGTERM/SIGINT into the Qt event loop: the C-level handler writes
+        # the signal number to a wakeup pipe, which wakes QSocketNotifier even
+        # while Qt is blocked in C++ and Python handlers can't run
+        self._sig_r, sig_w = os.pipe()
+        os.set_blocking(self._sig_r, False)
+        os.set_blocking(sig_w, False)
+        signal.set_wakeup_fd(sig_w)
+        for sig in [signal.SIGTERM, signal.SIGINT]:
+            signal.signal(sig, lambda s, f: None)  # real work happens in on_unix_signal
+        self._sig_notifier = QSocketNotifier(self._sig_r, QSocketNotifier.Type.Read, self)
+        self._sig_notifier.activated.connect(self.on_unix_signal)
 
         # Settings
         self.settings = QSettings(ORG_NAME, APP_NAME)
         logger.info(f"Settings file: {self.settings.fileName()}")
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(SETTINGS_FLUSH_DELAY_MS)
+        self._flush_timer.timeout.connect(self._flush_settings)
+
+        # Live wheel/slider updates are coalesced and sent at most every LIVE_COLOR_INTERVAL_MS
+        self._pending_color = None
+        self._hid_timer = QTimer(self)
+        self._hid_timer.setSingleShot(True)
+        self._hid_timer.setInterval(LIVE_COLOR_INTERVAL_MS)
+        self._hid_timer.timeout.connect(self._flush_hid_color)
+
+        # Read all persisted values in one pass; afterwards the cache is the source of truth
+        self._settings_cache = {key: self.settings.value(key, default, typ) for key, default, typ in SETTINGS_DEFAULTS}
 
         # Device path
-        self.device_path = self.settings.value("device_path", DEFAULT_DEVICE_PATH, str)
+        self.device_path = self._get("device_path")
 
         self.animator = AnimationController(lambda: self.device_path)
         self.animator.thread_state.connect(self.on_thread_state)
 
         # State
-        self.current_color = [
-            self.settings.value("color_r", 0, int),
-            self.settings.value("color_g", 0, int),
-            self.settings.value("color_b", 255, int),
-        ]
-        self.current_intensity = self.settings.value("intensity", 255, int)
-        self.last_style = self.settings.value("last_style", "Static", str)
-        # Speed interval is now loaded in create_speed_control
+        self.current_color = [self._get("color_r"), self._get("color_g"), self._get("color_b")]
+        self.current_intensity = self._get("intensity")
+        self.last_style = self._get("last_style")
 
         logger.info(f"Loaded settings: RGB({self.current_color[0]},{self.current_color[1]},{self.current_color[2]}) I={self.current_intensity} style={self.last_style}")
 
-        presets_json = self.settings.value("user_presets_json", "[]", str)
         try:
-            self.user_presets = json.loads(presets_json)
+            self.user_presets = json.loads(self._get("user_presets_json"))
         except Exception:
             self.user_presets = []
+        self._presets_dirty = False  # user_presets is authoritative; serialized on flush
 
         # Device availability
-        self.device_available = os.path.exists(self.device_path)
+        self.device_available = device_exists(self.device_path)
         if self.device_available:
             logger.info(f"Device found: {self.device_path}")
         else:
@@ -833,6 +1075,7 @@ class KeyboardLightingWindow(QMainWindow):
         bar_layout.addWidget(save_btn)
 
         self.preset_bar = QHBoxLayout()
+        self._preset_buttons = []
         self.reload_user_presets_bar()
         group_layout.addLayout(bar_layout)
         group_layout.addLayout(self.preset_bar)
@@ -868,7 +1111,8 @@ class KeyboardLightingWindow(QMainWindow):
         self.speed_slider = QSlider(Qt.Orientation.Horizontal)
         self.speed_slider.setMinimum(0)
         self.speed_slider.setMaximum(100)
-        saved_interval = self.settings.value("speed_interval", 0.5, float)
+        saved_interval = self._get("speed_interval")
+        self._last_interval = saved_interval  # interval both widgets currently agree on
         self.speed_slider.setValue(self._interval_to_slider(saved_interval))
         self.speed_slider.valueChanged.connect(self.on_speed_slider_changed)
         slider_layout.addWidget(self.speed_slider)
@@ -900,30 +1144,30 @@ class KeyboardLightingWindow(QMainWindow):
     def _slider_to_interval(self, slider_value):
         """
         Convert slider (0-100) to interval (0.01-30s) logarithmically.
-        Formula: interval = 10^(1 - 0.03*value)
+        Formula: interval = 10^(1 - 0.03*value), looked up from _SLIDER_TO_INTERVAL
         - value=0 (slow) → 10s
         - value=100 (fast) → 0.01s
         """
-        exponent = 1.0 - 0.03 * slider_value
-        interval = 10 ** exponent
-        return max(0.01, min(30.0, interval))
+        return self._SLIDER_TO_INTERVAL[slider_value]
 
     def _interval_to_slider(self, interval):
         """
         Convert interval (0.01-30s) to slider (0-100).
-        Inverse: value = (1 - log10(interval)) / 0.03
+        Inverse: value = round((1 - log10(interval)) / 0.03), found by bisecting _SLIDER_BOUNDS
         """
         interval = max(0.01, min(30.0, interval))
-        slider_value = (1.0 - math.log10(interval)) / 0.03
-        return int(round(slider_value))
+        return len(self._SLIDER_BOUNDS) - bisect.bisect_left(self._SLIDER_BOUNDS, interval)
 
+    @pyqtSlot(int)
     def on_speed_slider_changed(self, value):
         """Slider moved - update text input"""
         interval = self._slider_to_interval(value)
+        self._last_interval = interval
         self.speed_input.blockSignals(True)
         self.speed_input.setText(f"{interval:.2f}")
         self.speed_input.blockSignals(False)
 
+    @pyqtSlot()
     def on_speed_input_changed(self):
         """Text changed - update slider"""
         try:
@@ -932,6 +1176,9 @@ class KeyboardLightingWindow(QMainWindow):
             interval = max(0.01, min(30.0, interval))
             if abs(float(text) - interval) > 0.001:
                 self.speed_input.setText(f"{interval:.2f}")
+            if abs(interval - self._last_interval) < 1e-9:
+                return
+            self._last_interval = interval
             slider_value = self._interval_to_slider(interval)
             self.speed_slider.blockSignals(True)
             self.speed_slider.setValue(slider_value)
@@ -973,28 +1220,48 @@ class KeyboardLightingWindow(QMainWindow):
         layout.addLayout(btn_layout)
 
     # --- Callbacks ---
+    @pyqtSlot(int, int, int)
     def send_live_color(self, r, g, b):
         if not self.device_available:
             return
-        disable_autonomous(self.device_path)
+        self._pending_color = (r, g, b)
+        if not self._hid_timer.isActive():
+            self._hid_timer.start()
+
+    @pyqtSlot()
+    def _flush_hid_color(self):
+        """Send the latest live color; intermediate drag positions are dropped"""
+        if self._pending_color is None or not self.device_available:
+            return
+        r, g, b = self._pending_color
+        self._pending_color = None
+        disable_autonomous(self.device_path, force=False)
         set_color(self.device_path, r, g, b, self.current_intensity)
 
+    def _drop_pending_live_color(self):
+        """Keep a throttled live color from landing on top of a new animation or the Stop reset"""
+        self._hid_timer.stop()
+        self._pending_color = None
+
     def on_thread_state(self, state: str):
         logger.debug(f"Animator state: {state}")
 
+    @pyqtSlot(int)
     def on_style_changed(self, idx):
         self.apply_lighting()
 
+    @pyqtSlot(int, int, int)
     def on_wheel_changed(self, r, g, b):
         self.current_color = [r, g, b]
         self.persist_state()
         # If an animation is running, restart it with the new color
-        if self.animator.thread and self.animator.thread.is_alive():
+        if self.animator.is_running():
             current_style = self.style_combo.currentText()
             if current_style.lower() != "static":
                 logger.info(f"Updating animation color to RGB({r},{g},{b})")
                 self.apply_lighting()
 
+    @pyqtSlot(int)
     def on_value_changed(self, value):
         self.current_intensity = value
         self.value_label.setText(str(value))
@@ -1002,18 +1269,37 @@ class KeyboardLightingWindow(QMainWindow):
         self.color_wheel.setHSV(self.color_wheel.h, self.color_wheel.s, value / 255.0)
         self.persist_state()
         # Reapply live color
-        if self.device_available:
-            r, g, b = self.current_color
-            disable_autonomous(self.device_path)
-            set_color(self.device_path, r, g, b, self.current_intensity)
+        self.send_live_color(*self.current_color)
+
+    @contextmanager
+    def _batched_ui(self):
+        """
+        Apply several widget changes as one logical update: the wheel, slider
+        and style combo don't emit (callers update state and labels themselves)
+        and the window repaints once at the end
+        """
+        widgets = (self.color_wheel, self.value_slider, self.style_combo)
+        central = self.centralWidget()
+        central.setUpdatesEnabled(False)
+        was_blocked = [w.blockSignals(True) for w in widgets]
+        try:
+            yield
+        finally:
+            for w, blocked in zip(widgets, was_blocked):
+                w.blockSignals(blocked)
+            central.setUpdatesEnabled(True)
+            central.update()
 
     def apply_preset(self, name):
         r, g, b, i = PRESETS[name]
         logger.info(f"Preset applied: {name} -> RGB({r},{g},{b}) I({i})")
         self.current_color = [r, g, b]
         self.current_intensity = i
-        self.color_wheel.setRGB(r, g, b)
-        self.value_slider.setValue(i)
+        with self._batched_ui():
+            self.color_wheel.setRGB(r, g, b)
+            self.color_wheel.setHSV(self.color_wheel.h, self.color_wheel.s, i / 255.0)
+            self.value_slider.setValue(i)
+            self.value_label.setText(str(i))
         self.persist_state()
         self.apply_lighting()
 
@@ -1029,6 +1315,7 @@ class KeyboardLightingWindow(QMainWindow):
             interval = self._slider_to_interval(self.speed_slider.value())
             base_color = tuple(self.current_color)
             logger.info(f"Apply (temp): style={style}, base={base_color}, interval={interval}s, intensity={self.current_intensity}")
+            self._drop_pending_live_color()
             self.animator.start(style, base_color, interval)
         except Exception as e:
             logger.exception(f"Failed to apply lighting: {e}")
@@ -1047,10 +1334,9 @@ class KeyboardLightingWindow(QMainWindow):
             base_color = tuple(self.current_color)
             logger.info(f"Apply and Save: style={style}, base={base_color}, interval={interval}s, intensity={self.current_intensity}")
             # Save settings
-            self.settings.setValue("last_style", style)
-            self.settings.setValue("speed_interval", interval)
-            self.settings.sync()
-            logger.info("Settings saved")
+            self._set("last_style", style)
+            self._set("speed_interval", interval)
+            self._drop_pending_live_color()
             self.animator.start(style, base_color, interval)
         except Exception as e:
             logger.exception(f"Failed to apply lighting: {e}")
@@ -1058,17 +1344,21 @@ class KeyboardLightingWindow(QMainWindow):
 
     def stop_animation(self):
         logger.info("Stop animation requested - resetting to white")
+        self._drop_pending_live_color()
         self.animator.stop()
         # Reset to white with regular brightness
         self.current_color = [255, 255, 255]
         self.current_intensity = 255
-        self.color_wheel.setRGB(255, 255, 255)
-        self.value_slider.setValue(255)
-        self.style_combo.setCurrentText("Static")
+        with self._batched_ui():
+            self.color_wheel.setRGB(255, 255, 255)
+            self.value_slider.setValue(255)
+            self.value_label.setText("255")
+            self.style_combo.setCurrentText("Static")
+        self._set("last_style", "Static")
         self.persist_state()
         if self.device_available:
-            disable_autonomous(self.device_path)
-            set_color(self.device_path, 255, 255, 255, 255)
+            # Queued behind the stopping animation so its last frame can't overwrite white
+            self.animator.start("Static", (255, 255, 255), 0)
 
     def force_quit(self):
         logger.critical("Force quit invoked by user")
@@ -1084,57 +1374,101 @@ class KeyboardLightingWindow(QMainWindow):
             p.get("r") == r and p.get("g") == g and p.get("b") == b and p.get("i") == i)]
         self.user_presets.insert(0, preset)
         self.user_presets = self.user_presets[:16]
-        self.settings.setValue("user_presets_json", json.dumps(self.user_presets))
-        self.settings.sync()
+        self._presets_dirty = True
+        self._flush_timer.start()
         self.reload_user_presets_bar()
         logger.info(f"Saved user preset RGB({r},{g},{b}) I({i})")
 
-    def delete_user_preset(self, preset):
+    def delete_user_preset(self, preset, pos=None):
         self.user_presets = [p for p in self.user_presets if p != preset]
-        self.settings.setValue("user_presets_json", json.dumps(self.user_presets))
-        self.settings.sync()
+        self._presets_dirty = True
+        self._flush_timer.start()
         self.reload_user_presets_bar()
         logger.info("Deleted user preset")
 
     def reload_user_presets_bar(self):
-        # Clear existing widgets
-        while self.preset_bar.count():
-            item = self.preset_bar.takeAt(0)
-            w = item.widget()
-            if w: w.deleteLater()
-
-        for p in self.user_presets:
+        # Reuse existing buttons; the pool only grows or shrinks when the preset count changes
+        buttons = self._preset_buttons
+        for idx, p in enumerate(self.user_presets):
+            if idx < len(buttons):
+                btn = buttons[idx]
+                btn.clicked.disconnect()
+                btn.customContextMenuRequested.disconnect()
+            else:
+                btn = QPushButton()
+                btn.setFixedSize(24, 24)
+                # Right-click delete
+                btn.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+                self.preset_bar.addWidget(btn)
+                buttons.append(btn)
             r, g, b, i = p["r"], p["g"], p["b"], p["i"]
-            btn = QPushButton()
-            btn.setFixedSize(24, 24)
             btn.setToolTip(f"RGB({r},{g},{b}) I({i})")
-            btn.setStyleSheet(f"background-color: rgb({r},{g},{b}); border: 1px solid #555; border-radius: 4px;")
-            btn.clicked.connect(lambda checked=False, preset=p: self.apply_user_preset(preset))
-            # Right-click delete
-            btn.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-            btn.customContextMenuRequested.connect(lambda pos, preset=p: self.delete_user_preset(preset))
-            self.preset_bar.addWidget(btn)
-
-    def apply_user_preset(self, preset):
+            style = f"background-color: rgb({r},{g},{b}); border: 1px solid #555; border-radius: 4px;"
+            if btn.styleSheet() != style:
+                btn.setStyleSheet(style)
+            btn.clicked.connect(partial(self.apply_user_preset, p))
+            btn.customContextMenuRequested.connect(partial(self.delete_user_preset, p))
+
+        while len(buttons) > len(self.user_presets):
+            btn = buttons.pop()
+            self.preset_bar.removeWidget(btn)
+            btn.deleteLater()
+
+    def apply_user_preset(self, preset, checked=False):
         r, g, b, i = preset["r"], preset["g"], preset["b"], preset["i"]
         self.current_color = [r, g, b]
         self.current_intensity = i
-        self.value_slider.setValue(i)
-        self.color_wheel.setRGB(r, g, b)
+        with self._batched_ui():
+            self.value_slider.setValue(i)
+            self.value_label.setText(str(i))
+            self.color_wheel.setRGB(r, g, b)
         self.persist_state()
         self.apply_lighting()
 
     # --- Persistence ---
+    def _get(self, key):
+        return self._settings_cache[key]
+
+    def _set(self, key, value):
+        """Update a setting; unchanged values skip QSettings and the flush"""
+        if self._settings_cache.get(key) == value:
+            return
+        self._settings_cache[key] = value
+        self.settings.setValue(key, value)
+        self._flush_timer.start()
+
     def persist_state(self):
         r, g, b = self.current_color
-        self.settings.setValue("device_path", self.device_path)
-        self.settings.setValue("color_r", r)
-        self.settings.setValue("color_g", g)
-        self.settings.setValue("color_b", b)
-        self.settings.setValue("intensity", self.current_intensity)
+        self._set("device_path", self.device_path)
+        self._set("color_r", r)
+        self._set("color_g", g)
+        self._set("color_b", b)
+        self._set("intensity", self.current_intensity)
+
+    def _persist_presets_deferred(self):
+        if not self._presets_dirty:
+            return
+        self._presets_dirty = False
+        presets_json = json.dumps(self.user_presets)
+        self._settings_cache["user_presets_json"] = presets_json
+        self.settings.setValue("user_presets_json", presets_json)
+
+    def _flush_settings(self):
+        """Write pending settings to disk; called once edits settle and on close"""
+        self._flush_timer.stop()
+        self._persist_presets_deferred()
         self.settings.sync()
+        r, g, b = self.current_color
         logger.debug(f"Settings saved: RGB({r},{g},{b}) I={self.current_intensity} device={self.device_path}")
 
+    def on_unix_signal(self, *_):
+        try:
+            signums = os.read(self._sig_r, 64)
+        except BlockingIOError:
+            return
+        logger.info(f"Received signal(s) {list(signums)}, quitting")
+        QApplication.instance().quit()
+
     # --- IPC Handler ---
     def handle_ipc_command(self, msg):
         logger.info(f"IPC Command: {msg}")
@@ -1161,6 +1495,7 @@ class KeyboardLightingWindow(QMainWindow):
         logger.info("Window closing - animations will continue in background")
         try:
             self.persist_state()
+            self._flush_settings()
             # Don't remove PID file or stop animations
             # PID and Socket should remain active
         finally:
@@ -1177,12 +1512,12 @@ def main():
             os.kill(pid, 0)
             
             # Try to connect
-            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
             client.connect(str(SOCKET_FILE))
             
             # Send "show" command
             msg = {"command": "show"}
-            client.sendall(json.dumps(msg).encode('utf-8'))
+            client.send(json.dumps(msg).encode('utf-8'))
             print("Sent 'show' command to running instance.")
             sys.exit(0)
         except (ValueError, ProcessLookupError, FileNotFoundError, ConnectionRefusedError):
@@ -1220,6 +1555,8 @@ def main():
 
     logger.info("Application started")
     ret = app.exec()
+    window._flush_settings()
+    window.animator.shutdown()
     
     # Cleanup on exit
     PID_FILE.unlink(missing_ok=True)
@@ -10,14 +10,24 @@ import sys
 import fcntl
 import time
 import math
+import asyncio
 import threading
+import queue
 import logging
 import json
 import signal
+import struct
 from enum import IntEnum
 from pathlib import Path
 from typing import Optional, Tuple
 
+# Optional: compile the ripple frame update to native code when numba is installed
+try:
+    import numba
+    import numpy as np
+except ImportError:
+    numba = None
+
 # --- HID Constants ---
 class HIDReport(IntEnum):
     SET_COLOR = 0x05
@@ -48,31 +58,97 @@ logger = logging.getLogger("kbdrgb_daemon")
 def HIDIOCSFEATURE(length):
     return HIDConstants.IOCTL_BASE | (length << 16)
 
-def send_feature_report(dev_path: str, report_id: int, data: list) -> bool:
-    if not dev_path or not os.path.exists(dev_path):
+# SET_COLOR packet: report id, 0x01, start_id (LE16), end_id (LE16), r, g, b, i
+_SET_COLOR_PACKET = struct.Struct("<BBHHBBBB")
+_IOCTL_10 = HIDIOCSFEATURE(_SET_COLOR_PACKET.size)
+PACKET_CACHE_MAX = 4096
+_packet_cache = {}
+
+RIPPLE_SCHEDULE_SIZE = 2048  # must be a power of two
+
+def color_packet(r: int, g: int, b: int, i: int,
+                 start_id: int = HIDConstants.DEFAULT_LED_START,
+                 end_id: int = HIDConstants.DEFAULT_LED_END) -> bytes:
+    """Return the SET_COLOR packet for these values, reusing previously built ones"""
+    key = (r, g, b, i, start_id, end_id)
+    packet = _packet_cache.get(key)
+    if packet is None:
+        packet = _SET_COLOR_PACKET.pack(HIDReport.SET_COLOR, 0x01, start_id, end_id, r, g, b, i)
+        if len(_packet_cache) >= PACKET_CACHE_MAX:
+            _packet_cache.clear()
+        _packet_cache[key] = packet
+    return packet
+
+def open_device(dev_path: str) -> Optional[int]:
+    """Open the hidraw node, returning the fd or None if unavailable"""
+    if not dev_path:
+        return None
+    try:
+        return os.open(dev_path, os.O_RDWR)
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.error(f"HID error: {e}")
+        return None
+
+def close_device(fd: int):
+    try:
+        os.close(fd)
+    except OSError:
+        pass
+
+def _write_packet(fd: int, packet: bytes) -> bool:
+    """Send a prebuilt SET_COLOR packet on an open fd"""
+    try:
+        fcntl.ioctl(fd, _IOCTL_10, packet)
+        return True
+    except OSError as e:
+        logger.error(f"HID error: {e}")
         return False
-    fd = None
+
+def _send_fd(fd: int, report_id: int, data: list) -> bool:
+    """Send a feature report on an open fd"""
+    packet = bytes([report_id]) + bytes(data)
     try:
-        fd = os.open(dev_path, os.O_RDWR)
-        packet = bytes([report_id]) + bytes(data)
         fcntl.ioctl(fd, HIDIOCSFEATURE(len(packet)), packet)
         return True
     except OSError as e:
         logger.error(f"HID error: {e}")
         return False
+
+def send_feature_report(dev_path: str, report_id: int, data: list) -> bool:
+    fd = open_device(dev_path)
+    if fd is None:
+        return False
+    try:
+        return _send_fd(fd, report_id, data)
     finally:
-        if fd is not None:
-            try:
-                os.close(fd)
-            except OSError:
-                pass
+        close_device(fd)
 
-def disable_autonomous(dev_path: str) -> bool:
-    if send_feature_report(dev_path, HIDReport.DISABLE_AUTONOMOUS, [0x00]):
+def disable_autonomous_fd(fd: int) -> bool:
+    if _send_fd(fd, HIDReport.DISABLE_AUTONOMOUS, [0x00]):
         time.sleep(0.01)
         return True
     return False
 
+def disable_autonomous(dev_path: str) -> bool:
+    fd = open_device(dev_path)
+    if fd is None:
+        return False
+    try:
+        return disable_autonomous_fd(fd)
+    finally:
+        close_device(fd)
+
+def clamp_color(color) -> Tuple[int, int, int]:
+    return tuple(max(0, min(255, int(c))) for c in color)
+
+def set_color_fd(fd: int, r: int, g: int, b: int, i: int,
+                 start_id: int = HIDConstants.DEFAULT_LED_START,
+                 end_id: int = HIDConstants.DEFAULT_LED_END) -> bool:
+    """Set LED color on an open fd; values must already be in 0..255"""
+    return _write_packet(fd, color_packet(r, g, b, i, start_id, end_id))
+
 def set_color(dev_path: str, r: int, g: int, b: int, i: int,
               start_id: int = None, end_id: int = None) -> bool:
     if start_id is None:
@@ -80,94 +156,211 @@ def set_color(dev_path: str, r: int, g: int, b: int, i: int,
     if end_id is None:
         end_id = HIDConstants.DEFAULT_LED_END
 
-    r = max(0, min(255, int(r)))
-    g = max(0, min(255, int(g)))
-    b = max(0, min(255, int(b)))
+    r, g, b = clamp_color((r, g, b))
     i = max(0, min(HIDConstants.MAX_INTENSITY, int(i)))
 
-    payload = [
-        0x01,
-        start_id & 0xFF, (start_id >> 8) & 0xFF,
-        end_id & 0xFF, (end_id >> 8) & 0xFF,
-        r, g, b, i
-    ]
-    return send_feature_report(dev_path, HIDReport.SET_COLOR, payload)
+    fd = open_device(dev_path)
+    if fd is None:
+        return False
+    try:
+        return set_color_fd(fd, r, g, b, i, start_id, end_id)
+    finally:
+        close_device(fd)
+
+# --- inotify helpers ---
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+_INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; name follows
+
+def inotify_watch(directory: str, mask: int) -> Optional[int]:
+    """Create a non-blocking inotify fd watching directory, or None if unsupported"""
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, "inotify_add_watch failed")
+        return fd
+    except (OSError, AttributeError) as e:
+        logger.warning(f"inotify unavailable, falling back to polling: {e}")
+        return None
+
+def inotify_names(fd: int) -> list:
+    """Drain pending inotify events and return the file names they refer to"""
+    try:
+        buf = os.read(fd, 4096)
+    except BlockingIOError:
+        return []
+    names = []
+    offset = 0
+    while offset + _INOTIFY_EVENT.size <= len(buf):
+        _, _, _, length = _INOTIFY_EVENT.unpack_from(buf, offset)
+        offset += _INOTIFY_EVENT.size
+        names.append(buf[offset:offset + length].rstrip(b"\0").decode(errors="replace"))
+        offset += length
+    return names
 
 # --- Animations ---
-def breathing(dev_path, base_color, interval, stop_event):
-    r, g, b = base_color
+# Each animation is a coroutine run as a task on the daemon loop and stopped by
+# cancelling it; it keeps the hidraw fd open for its whole lifetime
+async def breathing(dev_path, base_color, interval):
+    r, g, b = clamp_color(base_color)
     steps = max(90, int(120 * interval))
-    if not disable_autonomous(dev_path):
+    # Intensity curve is fixed for a given step count, compute it once
+    intensities = [int(((1 - math.cos((2 * math.pi) * (k / steps))) * 0.5) * 255) for k in range(steps)]
+    fd = open_device(dev_path)
+    if fd is None:
         return
-    while not stop_event.is_set():
-        for k in range(steps):
-            if stop_event.is_set():
-                return
-            phase = (2 * math.pi) * (k / steps)
-            intensity = int(((1 - math.cos(phase)) * 0.5) * 255)
-            set_color(dev_path, r, g, b, intensity)
-            time.sleep(max(0.002, interval / steps))
+    try:
+        if not disable_autonomous_fd(fd):
+            return
+        while True:
+            for k in range(steps):
+                set_color_fd(fd, r, g, b, intensities[k])
+                await asyncio.sleep(max(0.002, interval / steps))
+    finally:
+        close_device(fd)
 
-def rainbow(dev_path, interval, stop_event):
+async def rainbow(dev_path, interval):
     steps = 180
-    if not disable_autonomous(dev_path):
+    # Colors repeat every cycle, so compute them once (simple RGB without QColor)
+    phase_g = 2 * math.pi / 3
+    phase_b = 4 * math.pi / 3
+    lut = [
+        (int(255 * (math.sin(2 * math.pi * k / steps) * 0.5 + 0.5)),
+         int(255 * (math.sin(2 * math.pi * k / steps + phase_g) * 0.5 + 0.5)),
+         int(255 * (math.sin(2 * math.pi * k / steps + phase_b) * 0.5 + 0.5)))
+        for k in range(steps)
+    ]
+    fd = open_device(dev_path)
+    if fd is None:
         return
-    while not stop_event.is_set():
-        for k in range(steps):
-            if stop_event.is_set():
-                return
-            hue = k / steps
-            # Simple RGB calculation without QColor
-            phase_g = 2 * math.pi / 3
-            phase_b = 4 * math.pi / 3
-            r = int(255 * (math.sin(2 * math.pi * hue) * 0.5 + 0.5))
-            g = int(255 * (math.sin(2 * math.pi * hue + phase_g) * 0.5 + 0.5))
-            b = int(255 * (math.sin(2 * math.pi * hue + phase_b) * 0.5 + 0.5))
-            set_color(dev_path, r, g, b, 255)
-            time.sleep(interval)
-
-def ripple(dev_path, base_color, interval, stop_event):
-    r, g, b = base_color
+    try:
+        if not disable_autonomous_fd(fd):
+            return
+        while True:
+            for k in range(steps):
+                r, g, b = lut[k]
+                set_color_fd(fd, r, g, b, 255)
+                await asyncio.sleep(interval)
+    finally:
+        close_device(fd)
+
+def _ripple_step(led_intensities, base_intensity, ripple_boost, keystroke_led):
+    """Advance ripple intensities by one frame in place; keystroke_led < 0 means no keystroke"""
+    leds = len(led_intensities)
+    if keystroke_led >= 0:
+        for i in range(max(0, keystroke_led - 2), min(leds, keystroke_led + 3)):
+            distance = abs(i - keystroke_led)
+            boost = ripple_boost // (distance + 1)
+            led_intensities[i] = min(255, led_intensities[i] + boost)
+    for seg in range(leds):
+        if led_intensities[seg] > base_intensity:
+            led_intensities[seg] = max(base_intensity, led_intensities[seg] - 2)
+
+if numba is not None:
+    _ripple_step = numba.njit(cache=True)(_ripple_step)
+
+async def ripple(dev_path, base_color, interval):
+    r, g, b = clamp_color(base_color)
     leds = 20
     base_intensity = int(0.20 * 255)
     ripple_boost = int(0.05 * 255)
     import random
-    led_intensities = [base_intensity] * leds
-
-    if not disable_autonomous(dev_path):
+    if numba is not None:
+        led_intensities = np.full(leds, base_intensity, dtype=np.int32)
+    else:
+        led_intensities = [base_intensity] * leds
+
+    # Prebuilt keystroke schedule, refilled each time it wraps around
+    def schedule():
+        return ([random.uniform(0.1, 0.5) for _ in range(RIPPLE_SCHEDULE_SIZE)],
+                random.choices(range(leds), k=RIPPLE_SCHEDULE_SIZE))
+    keystroke_dts, keystroke_leds = schedule()
+    event_idx = 0
+
+    fd = open_device(dev_path)
+    if fd is None:
         return
-    for seg in range(leds):
-        set_color(dev_path, r, g, b, base_intensity, seg*5, seg*5+4)
-
-    ripple_timer = 0
-    while not stop_event.is_set():
-        ripple_timer += interval
-        if ripple_timer >= random.uniform(0.1, 0.5):
-            ripple_timer = 0
-            keystroke_led = random.randint(0, leds - 1)
-            for i in range(max(0, keystroke_led - 2), min(leds, keystroke_led + 3)):
-                distance = abs(i - keystroke_led)
-                boost = ripple_boost // (distance + 1)
-                led_intensities[i] = min(255, led_intensities[i] + boost)
-
-        for seg in range(leds):
-            if led_intensities[seg] > base_intensity:
-                led_intensities[seg] = max(base_intensity, led_intensities[seg] - 2)
-            set_color(dev_path, r, g, b, led_intensities[seg], seg*5, seg*5+4)
-
-        if stop_event.is_set():
+    try:
+        if not disable_autonomous_fd(fd):
             return
-        time.sleep(interval)
+        for seg in range(leds):
+            set_color_fd(fd, r, g, b, base_intensity, seg*5, seg*5+4)
+        prev = list(led_intensities)
+
+        ripple_timer = 0
+        while True:
+            ripple_timer += interval
+            keystroke_led = -1
+            if ripple_timer >= keystroke_dts[event_idx]:
+                ripple_timer = 0
+                keystroke_led = keystroke_leds[event_idx]
+                event_idx = (event_idx + 1) & (RIPPLE_SCHEDULE_SIZE - 1)
+                if event_idx == 0:
+                    keystroke_dts, keystroke_leds = schedule()
+            _ripple_step(led_intensities, base_intensity, ripple_boost, keystroke_led)
+
+            # Only write segments that changed, merging adjacent equal ones into one range
+            seg = 0
+            while seg < leds:
+                value = led_intensities[seg]
+                if value == prev[seg]:
+                    seg += 1
+                    continue
+                hi = seg
+                while hi + 1 < leds and led_intensities[hi + 1] == value and prev[hi + 1] != value:
+                    hi += 1
+                set_color_fd(fd, r, g, b, int(value), seg*5, hi*5+4)
+                prev[seg:hi + 1] = led_intensities[seg:hi + 1]
+                seg = hi + 1
+
+            await asyncio.sleep(interval)
+    finally:
+        close_device(fd)
 
 # --- Daemon State Manager ---
 class DaemonState:
     def __init__(self):
         self.state_file = DAEMON_STATE_FILE
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
-        self.stop_event = threading.Event()
-        self.animation_thread = None
+        self.animation_task = None
         self.current_animation = None
         self.watch_timer = None
+        self.watch_fd = None
+        self.last_mtime = 0
+        self._last_state_bytes = None
+        # All file writes go through one background thread so they never stall the loop
+        self._write_q = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True, name="Daemon-writer")
+        self._writer.start()
+
+    def _writer_loop(self):
+        while True:
+            item = self._write_q.get()
+            if item is None:
+                return
+            path, data = item
+            tmp = path.with_name(path.name + '.tmp')
+            try:
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+            except Exception as e:
+                logger.error(f"Failed to write {path}: {e}")
+
+    def write_file(self, path: Path, data: bytes):
+        """Queue an atomic write of data to path"""
+        self._write_q.put((path, data))
+
+    def close_writer(self):
+        """Finish all queued writes and stop the writer thread"""
+        self._write_q.put(None)
+        self._writer.join()
 
     def load_state(self):
         """Load desired state from file"""
@@ -181,67 +374,94 @@ class DaemonState:
             return None
 
     def save_state(self, state):
-        """Save current state to file"""
-        try:
-            with open(self.state_file, 'w') as f:
-                json.dump(state, f, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save state: {e}")
+        """Save current state to file atomically, skipping identical writes"""
+        data = json.dumps(state, indent=2).encode()
+        if data == self._last_state_bytes:
+            return
+        self._last_state_bytes = data
+        self.write_file(self.state_file, data)
 
     def start_animation(self, style, color, intensity, interval, device_path):
-        """Start animation in background thread"""
+        """Start animation as a task on the running event loop"""
         self.stop_animation()
 
         logger.info(f"Starting {style} animation: RGB{color} @ {intensity} intensity")
 
         if style.lower() == "static":
-            disable_autonomous(device_path)
-            set_color(device_path, *color, intensity)
+            fd = open_device(device_path)
+            if fd is None:
+                return
+            try:
+                disable_autonomous_fd(fd)
+                set_color_fd(fd, *clamp_color(color), max(0, min(HIDConstants.MAX_INTENSITY, int(intensity))))
+            finally:
+                close_device(fd)
             return
 
-        self.stop_event.clear()
-
         animations = {
-            "breathing": lambda: breathing(device_path, color, interval, self.stop_event),
-            "rainbow": lambda: rainbow(device_path, interval, self.stop_event),
-            "ripple": lambda: ripple(device_path, color, interval, self.stop_event),
+            "breathing": lambda: breathing(device_path, color, interval),
+            "rainbow": lambda: rainbow(device_path, interval),
+            "ripple": lambda: ripple(device_path, color, interval),
         }
 
         if style.lower() in animations:
-            self.animation_thread = threading.Thread(
-                target=animations[style.lower()],
-                daemon=False,
+            self.animation_task = asyncio.get_running_loop().create_task(
+                animations[style.lower()](),
                 name=f"Daemon-{style}"
             )
-            self.animation_thread.start()
             self.current_animation = style
         else:
             logger.warning(f"Unknown animation: {style}")
 
     def stop_animation(self):
         """Stop current animation"""
-        if self.animation_thread and self.animation_thread.is_alive():
+        if self.animation_task and not self.animation_task.done():
             logger.info(f"Stopping {self.current_animation}")
-            self.stop_event.set()
-            self.animation_thread.join(timeout=2.0)
-        self.animation_thread = None
+            self.animation_task.cancel()
+        self.animation_task = None
         self.current_animation = None
 
     def watch_state_file(self):
         """Watch state file for changes and react"""
-        last_mtime = 0
-        while not self.stop_event.is_set():
-            try:
-                if self.state_file.exists():
-                    mtime = self.state_file.stat().st_mtime
-                    if mtime > last_mtime:
-                        last_mtime = mtime
-                        state = self.load_state()
-                        if state:
-                            self.apply_state(state)
-            except Exception as e:
-                logger.error(f"Watch error: {e}")
-            time.sleep(1)
+        self.watch_fd = inotify_watch(str(self.state_file.parent), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if self.watch_fd is None:
+            self.check_state_file()
+            return
+        asyncio.get_running_loop().add_reader(self.watch_fd, self.on_state_file_event)
+
+    def unwatch_state_file(self):
+        if self.watch_fd is not None:
+            asyncio.get_running_loop().remove_reader(self.watch_fd)
+            os.close(self.watch_fd)
+            self.watch_fd = None
+        if self.watch_timer:
+            self.watch_timer.cancel()
+            self.watch_timer = None
+
+    def on_state_file_event(self):
+        """Reload state when the state file is rewritten or renamed into place"""
+        if self.state_file.name not in inotify_names(self.watch_fd):
+            return
+        try:
+            state = self.load_state()
+            if state:
+                self.apply_state(state)
+        except Exception as e:
+            logger.error(f"Watch error: {e}")
+
+    def check_state_file(self):
+        """Poll the state file mtime, rescheduling itself every second"""
+        try:
+            if self.state_file.exists():
+                mtime = self.state_file.stat().st_mtime
+                if mtime > self.last_mtime:
+                    self.last_mtime = mtime
+                    state = self.load_state()
+                    if state:
+                        self.apply_state(state)
+        except Exception as e:
+            logger.error(f"Watch error: {e}")
+        self.watch_timer = asyncio.get_running_loop().call_later(1, self.check_state_file)
 
     def apply_state(self, state):
         """Apply state from config"""
@@ -257,62 +477,64 @@ class DaemonState:
 class RGBDaemon:
     def __init__(self):
         self.state_manager = DaemonState()
-        self.running = True
+        self.shutdown_event = None
 
     def write_pid(self):
         """Write PID file"""
         PID_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(PID_FILE, 'w') as f:
-            f.write(str(os.getpid()))
+        self.state_manager.write_file(PID_FILE, str(os.getpid()).encode())
 
     def remove_pid(self):
         """Remove PID file"""
         if PID_FILE.exists():
             PID_FILE.unlink()
 
-    def signal_handler(self, signum, frame):
+    def signal_handler(self, signum):
         """Handle shutdown signals"""
         logger.info(f"Received signal {signum}, shutting down...")
-        self.running = False
-        self.state_manager.stop_event.set()
-        self.state_manager.stop_animation()
+        self.shutdown_event.set()
 
-    def run(self):
-        """Main daemon loop"""
-        logger.info("RGB Daemon starting...")
+    async def serve(self):
+        """Main daemon loop: animations and state watching share one event loop"""
+        loop = asyncio.get_running_loop()
+        self.shutdown_event = asyncio.Event()
 
         # Setup signal handlers
-        signal.signal(signal.SIGTERM, self.signal_handler)
-        signal.signal(signal.SIGINT, self.signal_handler)
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self.signal_handler, signum)
 
-        self.write_pid()
+        # Load initial state
+        state = self.state_manager.load_state()
+        if state:
+            self.state_manager.apply_state(state)
 
-        try:
-            # Load initial state
-            state = self.state_manager.load_state()
-            if state:
-                self.state_manager.apply_state(state)
+        # Start watching for state changes
+        self.state_manager.watch_state_file()
 
-            # Start watching for state changes
-            watch_thread = threading.Thread(
-                target=self.state_manager.watch_state_file,
-                daemon=False
-            )
-            watch_thread.start()
+        logger.info("RGB Daemon running (PID: {})".format(os.getpid()))
+        logger.info(f"State file: {DAEMON_STATE_FILE}")
+        logger.info("Send SIGTERM or SIGINT to stop")
 
-            logger.info("RGB Daemon running (PID: {})".format(os.getpid()))
-            logger.info(f"State file: {DAEMON_STATE_FILE}")
-            logger.info("Send SIGTERM or SIGINT to stop")
+        await self.shutdown_event.wait()
 
-            # Keep daemon alive
-            while self.running:
-                time.sleep(1)
+        logger.info("RGB Daemon shutting down...")
+        self.state_manager.unwatch_state_file()
+        task = self.state_manager.animation_task
+        self.state_manager.stop_animation()
+        if task:
+            await asyncio.gather(task, return_exceptions=True)
 
-            logger.info("RGB Daemon shutting down...")
-            self.state_manager.stop_animation()
-            watch_thread.join(timeout=2)
+    def run(self):
+        """Run the daemon until SIGTERM or SIGINT"""
+        logger.info("RGB Daemon starting...")
 
+        self.write_pid()
+
+        try:
+            asyncio.run(self.serve())
         finally:
+            # Drain pending writes first so a late PID write can't recreate the file
+            self.state_manager.close_writer()
             self.remove_pid()
             logger.info("RGB Daemon stopped")
 
@@ -9,22 +9,34 @@ Integrated Keyboard RGB Controller
 import os
 import sys
 import fcntl
+import errno
 import time
 import math
 import threading
 import logging
+from logging.handlers import QueueHandler, QueueListener
 import queue
 import json
+import atexit
+import functools
+import ctypes
+import ctypes.util
 from pathlib import Path
 from enum import IntEnum
 from typing import Optional, Tuple
 
+# Optional: orjson encodes straight to bytes, much faster than the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QSlider, QLabel, QComboBox, QGroupBox, QGridLayout,
-    QMessageBox, QPlainTextEdit, QDockWidget, QCheckBox, QColorDialog
+    QPlainTextEdit, QDockWidget, QCheckBox
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject, QSettings
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject, QSettings, QFileSystemWatcher
 from PyQt6.QtGui import QColor, QPalette
 
 # --- HID Constants ---
@@ -44,64 +56,154 @@ ORG_NAME = "kbdrgb"
 DEFAULT_DEVICE_PATH = os.environ.get("KBDRGB_HID", "/dev/hidraw1")
 DAEMON_STATE_FILE = Path.home() / ".config" / "kbdrgb" / "daemon_state.json"
 DAEMON_PID_FILE = Path.home() / ".config" / "kbdrgb" / "daemon.pid"
+BRIGHTNESS_DEBOUNCE_MS = 30
+DAEMON_CHECK_TTL_SEC = 1.0
+HID_IOCTL_RETRIES = 5  # attempts per report on a stalled endpoint (EPIPE/EINTR)
+PERSIST_DELAY_MS = 500
 
 # Ensure config directory exists
 DAEMON_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
 
 # --- Logging ---
-log_queue = queue.Queue(maxsize=10000)
-
-class QueueHandler(logging.Handler):
+# Callers only enqueue records; a QueueListener thread formats them for stderr
+# and for the GUI console, which drains console_queue on its timer
+log_queue = queue.SimpleQueue()
+console_queue = queue.SimpleQueue()
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that runs strftime at most once per second of record time"""
+    _last_t = None
+    _last_s = ""
+
+    def formatTime(self, record, datefmt=None):
+        t = int(record.created)
+        if t != self._last_t:
+            self._last_t = t
+            self._last_s = time.strftime(datefmt or "%H:%M:%S", time.localtime(t))
+        return self._last_s
+
+class ConsoleQueueHandler(logging.Handler):
     def emit(self, record):
-        formatted = self.format(record)
-        try:
-            log_queue.put_nowait(formatted)
-        except queue.Full:
-            try:
-                log_queue.get_nowait()
-            except queue.Empty:
-                pass
-            try:
-                log_queue.put_nowait(formatted)
-            except queue.Full:
-                pass
+        console_queue.put(self.format(record))
 
 logger = logging.getLogger("kbdrgb")
 logger.setLevel(logging.DEBUG)
-handler = QueueHandler()
-formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s", "%H:%M:%S")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+logger.addHandler(QueueHandler(log_queue))
+formatter = CachedTimeFormatter("%(asctime)s [%(levelname)s] %(message)s", "%H:%M:%S")
+stream_handler = logging.StreamHandler()
+console_handler = ConsoleQueueHandler()
+for handler in (stream_handler, console_handler):
+    handler.setFormatter(formatter)
+log_listener = QueueListener(log_queue, stream_handler, console_handler)
+log_listener.start()
+# Registered before the fd-cache hook so it runs after it (atexit is LIFO) and late records still get out
+atexit.register(log_listener.stop)
 
 # --- HID helpers ---
 def HIDIOCSFEATURE(length):
     return HIDConstants.IOCTL_BASE | (length << 16)
 
+# Open hidraw fds, kept across reports so each one costs a single ioctl
+_FD_CACHE: dict = {}
+_FD_LOCK = threading.Lock()
+
+def _close_fd(dev_path: str):
+    fd = _FD_CACHE.pop(dev_path, None)
+    if fd is not None:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+@atexit.register
+def close_cached_fds():
+    with _FD_LOCK:
+        for dev_path in list(_FD_CACHE):
+            _close_fd(dev_path)
+
+# Call libc ioctl directly with a fixed prototype, skipping fcntl.ioctl's argument dispatch
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    _libc_ioctl = _libc.ioctl
+    _libc_ioctl.argtypes = [ctypes.c_int, ctypes.c_ulong, ctypes.c_char_p]
+    _libc_ioctl.restype = ctypes.c_int
+except (OSError, AttributeError):
+    _libc_ioctl = None
+
+def _raw_ioctl(fd: int, request: int, packet):
+    if _libc_ioctl is None:
+        fcntl.ioctl(fd, request, packet)
+        return
+    if _libc_ioctl(fd, request, bytes(packet)) < 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+def _ioctl_retry(fd: int, request: int, packet: bytes):
+    """ioctl that retries transient EPIPE/EINTR with a short back-off; other errors propagate"""
+    for attempt in range(HID_IOCTL_RETRIES):
+        try:
+            _raw_ioctl(fd, request, packet)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EPIPE, errno.EINTR) or attempt == HID_IOCTL_RETRIES - 1:
+                raise
+            time.sleep(0.0005)
+
+def _send_locked(dev_path: str, request: int, packet) -> bool:
+    """Send a full report packet on the cached fd; caller holds _FD_LOCK"""
+    # A cached fd can go stale (e.g. after a replug): evict it and retry once with a fresh open
+    for attempt in range(2):
+        try:
+            fd = _FD_CACHE.get(dev_path)
+            if fd is None:
+                fd = _FD_CACHE[dev_path] = os.open(dev_path, os.O_RDWR | os.O_CLOEXEC)
+            _ioctl_retry(fd, request, packet)
+            return True
+        except OSError as e:
+            _close_fd(dev_path)
+            if attempt or isinstance(e, (FileNotFoundError, PermissionError)):
+                logger.error(f"HID error: {e}")
+                return False
+
 def send_feature_report(dev_path: str, report_id: int, data: list) -> bool:
-    if not dev_path or not os.path.exists(dev_path):
+    if not dev_path:
         logger.error(f"Device path invalid: {dev_path}")
         return False
-    fd = None
-    try:
-        fd = os.open(dev_path, os.O_RDWR)
-        packet = bytes([report_id]) + bytes(data)
-        fcntl.ioctl(fd, HIDIOCSFEATURE(len(packet)), packet)
-        return True
-    except OSError as e:
-        logger.error(f"HID error: {e}")
+    packet = bytes([report_id]) + bytes(data)
+    with _FD_LOCK:
+        return _send_locked(dev_path, HIDIOCSFEATURE(len(packet)), packet)
+
+# Both fixed-size reports get their ioctl numbers computed once
+_IOCTL_SET_COLOR = HIDIOCSFEATURE(10)
+_IOCTL_DISABLE_AUTO = HIDIOCSFEATURE(2)
+_DISABLE_AUTO_PACKET = bytes([HIDReport.DISABLE_AUTONOMOUS, 0x00])
+
+# Full-range SET_COLOR report: report id, 0x01, start_id=0 (LE16), end_id=100 (LE16), r, g, b, i.
+# Only the last four bytes change; they are rewritten in place under _FD_LOCK
+_SET_COLOR_TEMPLATE = bytearray(b'\x05\x01\x00\x00\x64\x00\x00\x00\x00\x00')
+
+def set_color_fast(dev_path: str, r: int, g: int, b: int, i: int,
+                   buf: bytearray = _SET_COLOR_TEMPLATE) -> bool:
+    """set_color for the default full LED range, reusing a prebuilt report buffer"""
+    if not dev_path:
+        logger.error(f"Device path invalid: {dev_path}")
         return False
-    finally:
-        if fd is not None:
-            try:
-                os.close(fd)
-            except OSError:
-                pass
+    with _FD_LOCK:
+        buf[6] = r & 0xFF
+        buf[7] = g & 0xFF
+        buf[8] = b & 0xFF
+        buf[9] = i & 0xFF
+        return _send_locked(dev_path, _IOCTL_SET_COLOR, buf)
 
 def disable_autonomous(dev_path: str) -> bool:
-    if send_feature_report(dev_path, HIDReport.DISABLE_AUTONOMOUS, [0x00]):
+    if not dev_path:
+        logger.error(f"Device path invalid: {dev_path}")
+        return False
+    with _FD_LOCK:
+        ok = _send_locked(dev_path, _IOCTL_DISABLE_AUTO, _DISABLE_AUTO_PACKET)
+    if ok:
         time.sleep(0.01)
-        return True
-    return False
+    return ok
 
 def set_color(dev_path: str, r: int, g: int, b: int, i: int,
               start_id: int = None, end_id: int = None) -> bool:
@@ -110,10 +212,9 @@ def set_color(dev_path: str, r: int, g: int, b: int, i: int,
     if end_id is None:
         end_id = HIDConstants.DEFAULT_LED_END
 
-    r = max(0, min(255, int(r)))
-    g = max(0, min(255, int(g)))
-    b = max(0, min(255, int(b)))
-    i = max(0, min(HIDConstants.MAX_INTENSITY, int(i)))
+    # Slider/QColor/preset values are in 0..255 and stored settings are clamped on load;
+    # masking just keeps bytes() happy
+    r, g, b, i = r & 0xFF, g & 0xFF, b & 0xFF, i & 0xFF
 
     payload = [
         0x01,
@@ -124,18 +225,32 @@ def set_color(dev_path: str, r: int, g: int, b: int, i: int,
     return send_feature_report(dev_path, HIDReport.SET_COLOR, payload)
 
 # --- Daemon Integration ---
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+_daemon_cache = {"mtime": None, "running": False, "checked": 0.0}
+
 def is_daemon_running() -> bool:
-    """Check if daemon is running"""
-    if not DAEMON_PID_FILE.exists():
+    """Check if daemon is running (cached for DAEMON_CHECK_TTL_SEC while the PID file is unchanged)"""
+    try:
+        mtime = DAEMON_PID_FILE.stat().st_mtime
+    except OSError:
         return False
+    now = time.monotonic()
+    if mtime == _daemon_cache["mtime"] and now - _daemon_cache["checked"] < DAEMON_CHECK_TTL_SEC:
+        return _daemon_cache["running"]
     try:
         with open(DAEMON_PID_FILE, 'r') as f:
             pid = int(f.read().strip())
         # Check if process exists
         os.kill(pid, 0)
-        return True
+        running = True
     except (ProcessLookupError, ValueError, OSError):
-        return False
+        running = False
+    _daemon_cache.update(mtime=mtime, running=running, checked=now)
+    return running
 
 def write_daemon_state(style: str, color: Tuple[int, int, int], intensity: int,
                        interval: float, device_path: str):
@@ -147,9 +262,12 @@ def write_daemon_state(style: str, color: Tuple[int, int, int], intensity: int,
         "interval": interval,
         "device_path": device_path
     }
+    # Write a sibling temp file and rename it over the target so the daemon never reads a partial file
+    tmp = DAEMON_STATE_FILE.with_suffix('.json.tmp')
     try:
-        with open(DAEMON_STATE_FILE, 'w') as f:
-            json.dump(state, f, indent=2)
+        with open(tmp, 'wb') as f:
+            f.write(_dumps(state))
+        os.replace(tmp, DAEMON_STATE_FILE)
         logger.info(f"Wrote daemon state: {style} RGB{color}")
     except Exception as e:
         logger.error(f"Failed to write daemon state: {e}")
@@ -169,6 +287,29 @@ PRESETS = {
 
 STYLES = ["Static", "Breathing", "Rainbow", "Ripple"]
 
+@functools.lru_cache(maxsize=256)
+def _text_color_for_rgb(r: int, g: int, b: int) -> str:
+    """Readable label color on top of an (r, g, b) background"""
+    return "white" if (r + g + b) / 3 < 128 else "black"
+
+# Preset button stylesheets, formatted once at import
+_PRESET_STYLES = {
+    name: f"background-color: rgb({r},{g},{b}); color: {_text_color_for_rgb(r, g, b)}; padding: 8px;"
+    for name, (r, g, b, _) in PRESETS.items()
+}
+
+@functools.cache
+def _dark_palette() -> QPalette:
+    """Dark Fusion palette, built once on first use (needs a QApplication)"""
+    palette = QPalette()
+    palette.setColor(QPalette.ColorRole.Window, QColor(53, 53, 53))
+    palette.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.white)
+    palette.setColor(QPalette.ColorRole.Base, QColor(25, 25, 25))
+    palette.setColor(QPalette.ColorRole.Text, Qt.GlobalColor.white)
+    palette.setColor(QPalette.ColorRole.Button, QColor(53, 53, 53))
+    palette.setColor(QPalette.ColorRole.ButtonText, Qt.GlobalColor.white)
+    return palette
+
 # --- Log Console ---
 class LogConsole(QDockWidget):
     def __init__(self, parent=None):
@@ -176,6 +317,7 @@ class LogConsole(QDockWidget):
         self.setAllowedAreas(Qt.DockWidgetArea.BottomDockWidgetArea)
         self.view = QPlainTextEdit()
         self.view.setReadOnly(True)
+        self.view.setMaximumBlockCount(5000)  # trim old lines instead of growing forever
         self.setWidget(self.view)
 
         self.timer = QTimer(self)
@@ -183,12 +325,15 @@ class LogConsole(QDockWidget):
         self.timer.start(100)
 
     def flush_logs(self):
+        # One append per tick: a single layout/paint pass however many lines arrived
+        lines = []
         while True:
             try:
-                line = log_queue.get_nowait()
-                self.view.appendPlainText(line)
+                lines.append(console_queue.get_nowait())
             except queue.Empty:
                 break
+        if lines:
+            self.view.appendPlainText("\n".join(lines))
 
 # --- Main Window ---
 class IntegratedRGBController(QMainWindow):
@@ -202,18 +347,30 @@ class IntegratedRGBController(QMainWindow):
         # Device
         self.device_path = self.settings.value("device_path", DEFAULT_DEVICE_PATH, str)
         self.device_available = os.path.exists(self.device_path)
+        # Track hotplug via the device directory instead of stat()ing on every write
+        self._watcher = QFileSystemWatcher([os.path.dirname(self.device_path)], self)
+        self._watcher.directoryChanged.connect(self._recheck_device)
 
         # Daemon status
         self.daemon_mode = is_daemon_running()
 
-        # State
+        # State; stored values are clamped here, since the HID helpers trust their inputs
+        def byte_setting(key, default):
+            return max(0, min(255, self.settings.value(key, default, int)))
         self.current_color = [
-            self.settings.value("color_r", 255, int),
-            self.settings.value("color_g", 128, int),
-            self.settings.value("color_b", 0, int),
+            byte_setting("color_r", 255),
+            byte_setting("color_g", 128),
+            byte_setting("color_b", 0),
         ]
-        self.current_intensity = self.settings.value("intensity", 255, int)
+        self.current_intensity = byte_setting("intensity", 255)
         self.use_daemon = self.settings.value("use_daemon", True, bool)
+        self._autonomous_disabled = False
+        self._last_preview_key = None
+
+        # HID writes run on one background thread; the GUI only enqueues the latest color
+        self._write_q = queue.Queue(maxsize=2)
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True, name="HID-writer")
+        self._writer.start()
 
         logger.info(f"Loaded: RGB({self.current_color[0]},{self.current_color[1]},{self.current_color[2]}) I={self.current_intensity}")
         logger.info(f"Daemon mode: {self.daemon_mode}")
@@ -222,13 +379,22 @@ class IntegratedRGBController(QMainWindow):
 
         # Apply saved color if not using daemon
         if not self.use_daemon and self.device_available:
-            disable_autonomous(self.device_path)
-            set_color(self.device_path, *self.current_color, self.current_intensity)
+            self._enqueue(*self.current_color, self.current_intensity)
 
     def init_ui(self):
         self.setWindowTitle("Keyboard RGB Controller - Integrated")
         self.setGeometry(100, 100, 650, 750)
 
+        # Debounce timers: slider drags send one HID update, edits one settings write
+        self._bright_timer = QTimer(self)
+        self._bright_timer.setSingleShot(True)
+        self._bright_timer.setInterval(BRIGHTNESS_DEBOUNCE_MS)
+        self._bright_timer.timeout.connect(self._flush_brightness)
+        self._persist_timer = QTimer(self)
+        self._persist_timer.setSingleShot(True)
+        self._persist_timer.setInterval(PERSIST_DELAY_MS)
+        self._persist_timer.timeout.connect(self._flush_persist)
+
         central = QWidget()
         self.setCentralWidget(central)
         layout = QVBoxLayout()
@@ -241,10 +407,8 @@ class IntegratedRGBController(QMainWindow):
         layout.addWidget(title)
 
         # Status
-        status = "● Connected" if self.device_available else "● Not Found"
-        daemon_status = " | Daemon: Running" if self.daemon_mode else " | Daemon: Stopped"
-        self.status_label = QLabel(f"{status} ({self.device_path}){daemon_status}")
-        self.status_label.setStyleSheet(f"color: {'lime' if self.device_available else 'red'}; padding: 5px;")
+        self.status_label = QLabel()
+        self.update_status_label()
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.status_label)
 
@@ -290,7 +454,9 @@ class IntegratedRGBController(QMainWindow):
         self.brightness_slider = QSlider(Qt.Orientation.Horizontal)
         self.brightness_slider.setRange(0, 255)
         self.brightness_slider.setValue(self.current_intensity)
-        self.brightness_slider.valueChanged.connect(self.on_brightness_changed)
+        # Label/preview follow every step; HID and settings only get the value a drag ends on
+        self.brightness_slider.valueChanged.connect(self._on_brightness_preview)
+        self.brightness_slider.sliderReleased.connect(self._on_brightness_commit)
         brightness_layout.addWidget(QLabel("0"))
         brightness_layout.addWidget(self.brightness_slider)
         brightness_layout.addWidget(QLabel("255"))
@@ -304,10 +470,10 @@ class IntegratedRGBController(QMainWindow):
         presets_group = QGroupBox("Quick Presets")
         presets_grid = QGridLayout()
         row, col = 0, 0
-        for name, (r, g, b, i) in PRESETS.items():
+        for name in PRESETS:
             btn = QPushButton(name)
-            btn.setStyleSheet(f"background-color: rgb({r},{g},{b}); color: {'white' if (r+g+b)/3 < 128 else 'black'}; padding: 8px;")
-            btn.clicked.connect(lambda checked=False, n=name: self.apply_preset(n))
+            btn.setStyleSheet(_PRESET_STYLES[name])
+            btn.clicked.connect(self._on_preset_clicked)
             presets_grid.addWidget(btn, row, col)
             col += 1
             if col >= 3:
@@ -358,17 +524,29 @@ class IntegratedRGBController(QMainWindow):
 
         self.apply_dark_theme()
 
+    def update_status_label(self):
+        status = "● Connected" if self.device_available else "● Not Found"
+        daemon_status = " | Daemon: Running" if self.daemon_mode else " | Daemon: Stopped"
+        self.status_label.setText(f"{status} ({self.device_path}){daemon_status}")
+        self.status_label.setStyleSheet(f"color: {'lime' if self.device_available else 'red'}; padding: 5px;")
+
+    def _recheck_device(self, _path=None):
+        available = os.path.exists(self.device_path)
+        if available == self.device_available:
+            return
+        self.device_available = available
+        if available:
+            # A freshly plugged keyboard starts in autonomous mode again
+            self._autonomous_disabled = False
+            logger.info(f"Device connected: {self.device_path}")
+        else:
+            logger.warning(f"Device removed: {self.device_path}")
+        self.update_status_label()
+
     def apply_dark_theme(self):
         app = QApplication.instance()
         app.setStyle("Fusion")
-        palette = QPalette()
-        palette.setColor(QPalette.ColorRole.Window, QColor(53, 53, 53))
-        palette.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.white)
-        palette.setColor(QPalette.ColorRole.Base, QColor(25, 25, 25))
-        palette.setColor(QPalette.ColorRole.Text, Qt.GlobalColor.white)
-        palette.setColor(QPalette.ColorRole.Button, QColor(53, 53, 53))
-        palette.setColor(QPalette.ColorRole.ButtonText, Qt.GlobalColor.white)
-        app.setPalette(palette)
+        app.setPalette(_dark_palette())
 
     def on_daemon_mode_changed(self, state):
         self.use_daemon = bool(state)
@@ -376,6 +554,7 @@ class IntegratedRGBController(QMainWindow):
         logger.info(f"Daemon mode: {'enabled' if self.use_daemon else 'disabled'}")
 
     def pick_color(self):
+        from PyQt6.QtWidgets import QColorDialog  # only needed once the user opens the picker
         color = QColorDialog.getColor(QColor(*self.current_color), self, "Pick a Color")
         if color.isValid():
             self.current_color = [color.red(), color.green(), color.blue()]
@@ -383,32 +562,93 @@ class IntegratedRGBController(QMainWindow):
             self.persist_state()
             # Apply immediately if not using daemon
             if not self.use_daemon and self.device_available:
-                disable_autonomous(self.device_path)
-                set_color(self.device_path, *self.current_color, self.current_intensity)
+                self._enqueue(*self.current_color, self.current_intensity)
 
-    def on_brightness_changed(self, value):
+    def _on_brightness_preview(self, value):
         self.current_intensity = value
         self.brightness_value.setText(str(value))
         self.update_preview()
+        # Keyboard, wheel and programmatic changes have no release event: commit them debounced
+        if not self.brightness_slider.isSliderDown():
+            # Restarting the timer drops the previous pending value
+            self._bright_timer.start()
+
+    def _on_brightness_commit(self):
+        self._bright_timer.stop()
+        self._flush_brightness()
+
+    def _flush_brightness(self):
         self.persist_state()
         # Apply immediately if not using daemon
         if not self.use_daemon and self.device_available:
-            disable_autonomous(self.device_path)
-            set_color(self.device_path, *self.current_color, self.current_intensity)
+            self._enqueue(*self.current_color, self.current_intensity)
+
+    def _ensure_direct(self):
+        """Disable autonomous mode once; later updates skip the report and its sleep"""
+        if not self._autonomous_disabled and self.device_available:
+            if disable_autonomous(self.device_path):
+                self._autonomous_disabled = True
+
+    def _apply_direct(self, r, g, b, i):
+        self._ensure_direct()
+        if not set_color_fast(self.device_path, r, g, b, i):
+            # Device may have been replugged and be back in autonomous mode
+            self._autonomous_disabled = False
+
+    def _enqueue(self, *cmd):
+        """Queue (r, g, b, i) for the writer thread, replacing a stale pending one; no args stops it"""
+        cmd = cmd or None
+        try:
+            self._write_q.put_nowait(cmd)
+        except queue.Full:
+            try:
+                self._write_q.get_nowait()
+            except queue.Empty:
+                pass
+            self._write_q.put_nowait(cmd)
+
+    def _writer_loop(self):
+        stop = False
+        while not stop:
+            # Collapse everything queued so far: only the newest color matters
+            pending = [self._write_q.get()]
+            try:
+                while True:
+                    pending.append(self._write_q.get_nowait())
+            except queue.Empty:
+                pass
+            stop = None in pending
+            colors = [cmd for cmd in pending if cmd is not None]
+            if colors:
+                try:
+                    self._apply_direct(*colors[-1])
+                except Exception:
+                    # Keep the writer alive: one bad command must not stop every later write
+                    logger.exception("Direct HID write failed")
 
     def update_preview(self):
         r, g, b = self.current_color
-        factor = self.current_intensity / 255
-        dr, dg, db = int(r * factor), int(g * factor), int(b * factor)
+        # Skip the palette/stylesheet rebuild when nothing visible changed
+        key = (r, g, b, self.current_intensity)
+        if key == self._last_preview_key:
+            return
+        self._last_preview_key = key
+        # Exact integer floor of x * intensity / 255 (no float rounding)
+        i = self.current_intensity
+        dr, dg, db = r * i // 255, g * i // 255, b * i // 255
         color = QColor(dr, dg, db)
         palette = self.color_preview.palette()
         palette.setColor(QPalette.ColorRole.Window, color)
         self.color_preview.setAutoFillBackground(True)
         self.color_preview.setPalette(palette)
-        text_color = "white" if (r + g + b) / 3 < 128 else "black"
+        text_color = _text_color_for_rgb(r, g, b)
         self.color_preview.setText(f"RGB({r}, {g}, {b})\nBrightness: {self.current_intensity}")
         self.color_preview.setStyleSheet(f"color: {text_color}; font-size: 14px; font-weight: bold; border: 2px solid #333;")
 
+    def _on_preset_clicked(self):
+        # Shared slot for all preset buttons; the button label is the preset name
+        self.apply_preset(self.sender().text())
+
     def apply_preset(self, name):
         r, g, b, i = PRESETS[name]
         self.current_color = [r, g, b]
@@ -420,10 +660,10 @@ class IntegratedRGBController(QMainWindow):
         if self.use_daemon:
             write_daemon_state("static", (r, g, b), i, 0.1, self.device_path)
         elif self.device_available:
-            disable_autonomous(self.device_path)
-            set_color(self.device_path, r, g, b, i)
+            self._enqueue(r, g, b, i)
 
     def apply_lighting(self):
+        from PyQt6.QtWidgets import QMessageBox
         if not self.device_available:
             QMessageBox.warning(self, "Error", "Device not found")
             return
@@ -439,8 +679,7 @@ class IntegratedRGBController(QMainWindow):
             # Direct application (won't persist after close)
             logger.warning("Daemon mode disabled - animation will stop when GUI closes")
             if style.lower() == "static":
-                disable_autonomous(self.device_path)
-                set_color(self.device_path, *self.current_color, self.current_intensity)
+                self._enqueue(*self.current_color, self.current_intensity)
             else:
                 QMessageBox.information(self, "Info",
                     "Enable daemon mode for persistent animations.\n\n"
@@ -452,10 +691,14 @@ class IntegratedRGBController(QMainWindow):
             write_daemon_state("static", (0, 0, 0), 0, 0.1, self.device_path)
             logger.info("Sent stop command to daemon")
         elif self.device_available:
-            disable_autonomous(self.device_path)
-            set_color(self.device_path, 0, 0, 0, 0)
+            self._enqueue(0, 0, 0, 0)
 
     def persist_state(self):
+        # Coalesce rapid changes; the values are written once the timer fires
+        self._persist_timer.start()
+
+    def _flush_persist(self):
+        self._persist_timer.stop()
         r, g, b = self.current_color
         self.settings.setValue("color_r", r)
         self.settings.setValue("color_g", g)
@@ -463,12 +706,18 @@ class IntegratedRGBController(QMainWindow):
         self.settings.setValue("intensity", self.current_intensity)
         self.settings.setValue("device_path", self.device_path)
         self.settings.setValue("speed_slider", self.speed_slider.value())
-        self.settings.sync()
-        logger.debug(f"Settings saved: RGB({r},{g},{b}) I={self.current_intensity}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Settings saved: RGB(%d,%d,%d) I=%d", r, g, b, self.current_intensity)
 
     def closeEvent(self, event):
         logger.info("Closing GUI...")
-        self.persist_state()
+        self._bright_timer.stop()
+        self._flush_persist()
+        self.settings.sync()
+        # Stop the writer once it has sent the last queued color
+        self._enqueue()
+        self._writer.join(timeout=1.0)
+        self._autonomous_disabled = False
 
         if self.use_daemon:
             logger.info("Daemon mode enabled - animations will continue")
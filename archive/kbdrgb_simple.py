@@ -14,11 +14,21 @@ import time
 import math
 import threading
 import logging
-import queue
+import collections
 import json
+import functools
+import atexit
+from array import array
 from enum import IntEnum
 from typing import Optional, Tuple
 
+# Optional: compile the ripple frame update to native code when numba is installed
+try:
+    import numba
+    import numpy as np
+except ImportError:
+    numba = None
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QSlider, QLabel, QComboBox, QGroupBox, QGridLayout,
@@ -44,22 +54,26 @@ ORG_NAME = "kbdrgb"
 DEFAULT_DEVICE_PATH = os.environ.get("KBDRGB_HID", "/dev/hidraw1")
 
 # --- Logging ---
-log_queue = queue.Queue(maxsize=10000)
+# Bounded; append() on a full deque drops the oldest line
+log_queue = collections.deque(maxlen=10000)
+
+class LogNotifier(QObject):
+    """Wakes the log console when lines arrive, instead of it polling"""
+    lines_pending = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self.pending = False
+
+log_notifier = LogNotifier()
 
 class QueueHandler(logging.Handler):
     def emit(self, record):
-        formatted = self.format(record)
-        try:
-            log_queue.put_nowait(formatted)
-        except queue.Full:
-            try:
-                log_queue.get_nowait()
-            except queue.Empty:
-                pass
-            try:
-                log_queue.put_nowait(formatted)
-            except queue.Full:
-                pass
+        log_queue.append(self.format(record))
+        # One wakeup per batch; flush_logs clears the flag before draining
+        if not log_notifier.pending:
+            log_notifier.pending = True
+            log_notifier.lines_pending.emit()
 
 logger = logging.getLogger("kbdrgb")
 logger.setLevel(logging.DEBUG)
@@ -72,34 +86,144 @@ logger.addHandler(handler)
 def HIDIOCSFEATURE(length):
     return HIDConstants.IOCTL_BASE | (length << 16)
 
-def send_feature_report(dev_path: str, report_id: int, data: list) -> bool:
-    if not dev_path or not os.path.exists(dev_path):
+# Both fixed-size reports get their ioctl numbers computed once
+_IOCTL_SET_COLOR = HIDIOCSFEATURE(10)
+_IOCTL_DISABLE_AUTO = HIDIOCSFEATURE(2)
+_DISABLE_AUTO_PACKET = bytes([HIDReport.DISABLE_AUTONOMOUS, 0x00])
+
+DEVICE_EXISTS_TTL = 1.0
+_exists_cache = {}
+
+def _dev_exists(dev_path: str) -> bool:
+    """os.path.exists with a short per-path cache; the node rarely comes and goes"""
+    now = time.monotonic()
+    checked, exists = _exists_cache.get(dev_path, (0.0, False))
+    if now - checked < DEVICE_EXISTS_TTL:
+        return exists
+    exists = os.path.exists(dev_path)
+    _exists_cache[dev_path] = (now, exists)
+    return exists
+
+def _forget_exists(dev_path: str):
+    _exists_cache.pop(dev_path, None)
+
+def open_device(dev_path: str) -> Optional[int]:
+    if not dev_path or not _dev_exists(dev_path):
         logger.error(f"Device path invalid: {dev_path}")
-        return False
-    fd = None
+        return None
     try:
-        fd = os.open(dev_path, os.O_RDWR)
-        packet = bytes([report_id]) + bytes(data)
-        fcntl.ioctl(fd, HIDIOCSFEATURE(len(packet)), packet)
+        return os.open(dev_path, os.O_RDWR)
+    except OSError as e:
+        logger.error(f"HID error: {e}")
+        _forget_exists(dev_path)
+        return None
+
+def close_device(fd: int):
+    try:
+        os.close(fd)
+    except OSError:
+        pass
+
+# Feature reports only go out through the HIDIOCSFEATURE ioctl: hidraw has no
+# io_uring command support, and write() would send an output report instead.
+# Per-frame cost is therefore cut by sending fewer reports (ranged SET_COLOR
+# writes, see ripple) on an fd kept open for the whole animation.
+def _send_packet_fd(fd: int, request: int, packet: bytes) -> bool:
+    try:
+        fcntl.ioctl(fd, request, packet)
         return True
     except OSError as e:
         logger.error(f"HID error: {e}")
         return False
-    finally:
-        if fd is not None:
+
+def send_feature_report_fd(fd: int, report_id: int, data: list) -> bool:
+    """Send a feature report on an already open hidraw fd"""
+    packet = bytes([report_id]) + bytes(data)
+    return _send_packet_fd(fd, HIDIOCSFEATURE(len(packet)), packet)
+
+class HIDDevice:
+    """A hidraw node kept open for the life of the process"""
+    def __init__(self, path: str):
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR)
+        self.lock = threading.Lock()
+
+    def send_packet(self, request: int, packet: bytes) -> bool:
+        with self.lock:
+            fcntl.ioctl(self.fd, request, packet)
+        return True
+
+    def send(self, report_id: int, data: list) -> bool:
+        packet = bytes([report_id]) + bytes(data)
+        return self.send_packet(HIDIOCSFEATURE(len(packet)), packet)
+
+    def close(self):
+        with self.lock:
+            close_device(self.fd)
+
+_device_cache = {}
+_device_cache_lock = threading.Lock()
+
+def get_device(dev_path: str) -> Optional[HIDDevice]:
+    with _device_cache_lock:
+        dev = _device_cache.get(dev_path)
+        if dev is None:
+            if not dev_path or not _dev_exists(dev_path):
+                logger.error(f"Device path invalid: {dev_path}")
+                return None
             try:
-                os.close(fd)
-            except OSError:
-                pass
+                dev = HIDDevice(dev_path)
+            except OSError as e:
+                logger.error(f"HID error: {e}")
+                _forget_exists(dev_path)
+                return None
+            _device_cache[dev_path] = dev
+        return dev
+
+def drop_device(dev_path: str):
+    with _device_cache_lock:
+        dev = _device_cache.pop(dev_path, None)
+    if dev is not None:
+        dev.close()
+
+@atexit.register
+def close_devices():
+    with _device_cache_lock:
+        devices = list(_device_cache.values())
+        _device_cache.clear()
+    for dev in devices:
+        dev.close()
+
+def _send_packet(dev_path: str, request: int, packet: bytes) -> bool:
+    dev = get_device(dev_path)
+    if dev is None:
+        return False
+    try:
+        return dev.send_packet(request, packet)
+    except OSError as e:
+        logger.error(f"HID error: {e}")
+        # The node may have gone away (unplug/resume); reopen on the next call
+        drop_device(dev_path)
+        _forget_exists(dev_path)
+        return False
+
+def send_feature_report(dev_path: str, report_id: int, data: list) -> bool:
+    packet = bytes([report_id]) + bytes(data)
+    return _send_packet(dev_path, HIDIOCSFEATURE(len(packet)), packet)
+
+def disable_autonomous_fd(fd: int) -> bool:
+    if _send_packet_fd(fd, _IOCTL_DISABLE_AUTO, _DISABLE_AUTO_PACKET):
+        time.sleep(0.01)
+        return True
+    return False
 
 def disable_autonomous(dev_path: str) -> bool:
-    if send_feature_report(dev_path, HIDReport.DISABLE_AUTONOMOUS, [0x00]):
+    if _send_packet(dev_path, _IOCTL_DISABLE_AUTO, _DISABLE_AUTO_PACKET):
         time.sleep(0.01)
         return True
     return False
 
-def set_color(dev_path: str, r: int, g: int, b: int, i: int,
-              start_id: int = None, end_id: int = None) -> bool:
+def _color_packet(r, g, b, i, start_id, end_id) -> bytes:
     if start_id is None:
         start_id = HIDConstants.DEFAULT_LED_START
     if end_id is None:
@@ -110,13 +234,46 @@ def set_color(dev_path: str, r: int, g: int, b: int, i: int,
     b = max(0, min(255, int(b)))
     i = max(0, min(HIDConstants.MAX_INTENSITY, int(i)))
 
-    payload = [
-        0x01,
+    return bytes([
+        HIDReport.SET_COLOR, 0x01,
         start_id & 0xFF, (start_id >> 8) & 0xFF,
         end_id & 0xFF, (end_id >> 8) & 0xFF,
         r, g, b, i
-    ]
-    return send_feature_report(dev_path, HIDReport.SET_COLOR, payload)
+    ])
+
+def set_color_fd(fd: int, r: int, g: int, b: int, i: int,
+                 start_id: int = None, end_id: int = None) -> bool:
+    return _send_packet_fd(fd, _IOCTL_SET_COLOR, _color_packet(r, g, b, i, start_id, end_id))
+
+# Per-thread SET_COLOR report buffer: report id, 0x01, start_id (LE16), end_id (LE16), r, g, b, i.
+# Each animation thread rewrites its own copy in place instead of packing a new one per frame
+_set_color_buf = threading.local()
+
+def set_color_fast(fd: int, r: int, g: int, b: int, i: int,
+                   start_id: int = HIDConstants.DEFAULT_LED_START,
+                   end_id: int = HIDConstants.DEFAULT_LED_END) -> bool:
+    """Unchecked set_color_fd for animation loops; values must already be in 0..255"""
+    buf = getattr(_set_color_buf, "buf", None)
+    if buf is None:
+        buf = _set_color_buf.buf = bytearray(b'\x05\x01\x00\x00\x64\x00\x00\x00\x00\x00')
+    buf[2] = start_id & 0xFF
+    buf[3] = start_id >> 8
+    buf[4] = end_id & 0xFF
+    buf[5] = end_id >> 8
+    buf[6] = r
+    buf[7] = g
+    buf[8] = b
+    buf[9] = i
+    try:
+        fcntl.ioctl(fd, _IOCTL_SET_COLOR, buf)
+        return True
+    except OSError as e:
+        logger.error(f"HID error: {e}")
+        return False
+
+def set_color(dev_path: str, r: int, g: int, b: int, i: int,
+              start_id: int = None, end_id: int = None) -> bool:
+    return _send_packet(dev_path, _IOCTL_SET_COLOR, _color_packet(r, g, b, i, start_id, end_id))
 
 # --- Presets & Styles ---
 PRESETS = {
@@ -130,81 +287,164 @@ PRESETS = {
     "Pink": (255, 105, 180, 255),
     "Off": (0, 0, 0, 0),
 }
+# Append the readable label color for each preset: (r, g, b, i, text_color)
+PRESETS = {name: (r, g, b, i, "white" if r + g + b < 384 else "black")
+           for name, (r, g, b, i) in PRESETS.items()}
+
+_PREVIEW_QSS = "color: %s; font-size: 14px; font-weight: bold; border: 2px solid #333;"
+_PREVIEW_QSS_DARK = _PREVIEW_QSS % "white"
+_PREVIEW_QSS_LIGHT = _PREVIEW_QSS % "black"
 
 STYLES = ["Static", "Breathing", "Rainbow", "Flash", "Pulse", "Wave", "Spectrum", "Fade", "Strobe", "Ripple"]
 
+# --- Rainbow table ---
+RAINBOW_STEPS = 180
+
+def _build_rainbow_lut(steps: int) -> bytes:
+    """Full-saturation HSV->RGB for each rainbow step, as packed R,G,B triples."""
+    lut = bytearray()
+    for k in range(steps):
+        # H' = 6H split into sector and position within it, in integers only
+        sector, frac = divmod(6 * k, steps)
+        x = frac * 255 // steps
+        if sector & 1:
+            x = 255 - x
+        sectors = ((255, x, 0), (x, 255, 0), (0, 255, x),
+                   (0, x, 255), (x, 0, 255), (255, 0, x))
+        lut.extend(sectors[sector % 6])
+    return bytes(lut)
+
+RAINBOW_LUT = _build_rainbow_lut(RAINBOW_STEPS)
+
+@functools.lru_cache(maxsize=16)
+def breathing_lut(steps: int) -> array:
+    """One breathing cycle of intensities (raised cosine, 0..255)."""
+    return array('B', [int(((1 - math.cos(2 * math.pi * k / steps)) * 0.5) * 255)
+                       for k in range(steps)])
+
 # --- Animations (same as before) ---
+def _skip_missed(start, frame, dt):
+    """Frame to continue from: when more than a frame behind (stalled write), drop the missed frames instead of replaying them"""
+    behind = time.monotonic() - (start + frame * dt)
+    return frame + int(behind / dt) if dt > 0 and behind > dt else frame
+
 def breathing(dev_path, base_color, interval, stop_event):
     logger.info(f"[breathing] start")
-    r, g, b = base_color
+    r, g, b = (max(0, min(255, int(c))) for c in base_color)
     steps = max(90, int(120 * interval))
+    lut = breathing_lut(steps)
+    fd = open_device(dev_path)
+    if fd is None:
+        return
     try:
-        if not disable_autonomous(dev_path):
+        if not disable_autonomous_fd(fd):
             return
-        while not stop_event.is_set():
-            for k in range(steps):
-                if stop_event.is_set():
-                    return
-                phase = (2 * math.pi) * (k / steps)
-                intensity = int(((1 - math.cos(phase)) * 0.5) * 255)
-                set_color(dev_path, r, g, b, intensity)
-                time.sleep(max(0.002, interval / steps))
+        dt = max(0.002, interval / steps)
+        start = time.monotonic()
+        frame = 0
+        # The wait doubles as the stop check (wait(0) just polls when behind)
+        while not stop_event.wait(max(0.0, start + frame * dt - time.monotonic())):
+            set_color_fast(fd, r, g, b, lut[frame % steps])
+            frame = _skip_missed(start, frame + 1, dt)
     except Exception as e:
         logger.exception(f"[breathing] error: {e}")
+    finally:
+        close_device(fd)
 
 def rainbow(dev_path, interval, stop_event):
     logger.info(f"[rainbow] start")
-    steps = 180
+    steps = RAINBOW_STEPS
+    lut = RAINBOW_LUT
+    fd = open_device(dev_path)
+    if fd is None:
+        return
     try:
-        if not disable_autonomous(dev_path):
+        if not disable_autonomous_fd(fd):
             return
-        while not stop_event.is_set():
-            for k in range(steps):
-                if stop_event.is_set():
-                    return
-                hue = k / steps
-                c = QColor.fromHsvF(hue, 1.0, 1.0)
-                set_color(dev_path, c.red(), c.green(), c.blue(), 255)
-                time.sleep(interval)
+        start = time.monotonic()
+        frame = 0
+        while not stop_event.wait(max(0.0, start + frame * interval - time.monotonic())):
+            off = 3 * (frame % steps)
+            set_color_fast(fd, lut[off], lut[off + 1], lut[off + 2], 255)
+            frame = _skip_missed(start, frame + 1, interval)
     except Exception as e:
         logger.exception(f"[rainbow] error: {e}")
+    finally:
+        close_device(fd)
+
+def _ripple_step(led_intensities, base_intensity, boost_by_distance, keystroke_led, runs):
+    """Advance one ripple frame in place and run-length encode the result.
+
+    keystroke_led < 0 means no keystroke this frame. boost_by_distance[d] is
+    the boost for a segment d away from it (d = 0..2). Runs are written to the
+    flat buffer as (start_seg, end_seg, intensity) triples; returns the count.
+    """
+    leds = len(led_intensities)
+    if keystroke_led >= 0:
+        for i in range(max(0, keystroke_led - 2), min(leds, keystroke_led + 3)):
+            boost = boost_by_distance[abs(i - keystroke_led)]
+            led_intensities[i] = min(255, led_intensities[i] + boost)
+    for seg in range(leds):
+        if led_intensities[seg] > base_intensity:
+            led_intensities[seg] = max(base_intensity, led_intensities[seg] - 2)
+
+    n = 0
+    start = 0
+    for seg in range(1, leds + 1):
+        if seg == leds or led_intensities[seg] != led_intensities[start]:
+            runs[3*n] = start
+            runs[3*n + 1] = seg - 1
+            runs[3*n + 2] = led_intensities[start]
+            n += 1
+            start = seg
+    return n
+
+if numba is not None:
+    _ripple_step = numba.njit(cache=True)(_ripple_step)
 
 def ripple(dev_path, base_color, interval, stop_event):
     logger.info(f"[ripple] start")
-    r, g, b = base_color
+    r, g, b = (max(0, min(255, int(c))) for c in base_color)
     leds = 20
     base_intensity = int(0.20 * 255)
     ripple_boost = int(0.05 * 255)
     import random
-    led_intensities = [base_intensity] * leds
-
+    boost_by_distance = [ripple_boost // (d + 1) for d in range(3)]
+    if numba is not None:
+        led_intensities = np.full(leds, base_intensity, dtype=np.int32)
+        runs = np.zeros(3 * leds, dtype=np.int32)
+        boost_by_distance = np.array(boost_by_distance, dtype=np.int32)
+    else:
+        led_intensities = [base_intensity] * leds
+        runs = [0] * (3 * leds)
+
+    fd = open_device(dev_path)
+    if fd is None:
+        return
     try:
-        if not disable_autonomous(dev_path):
+        if not disable_autonomous_fd(fd):
             return
-        for seg in range(leds):
-            set_color(dev_path, r, g, b, base_intensity, seg*5, seg*5+4)
+        set_color_fast(fd, r, g, b, base_intensity, 0, leds*5-1)
 
         ripple_timer = 0
-        while not stop_event.is_set():
+        start = time.monotonic()
+        frame = 0
+        while not stop_event.wait(max(0.0, start + frame * interval - time.monotonic())):
             ripple_timer += interval
+            keystroke_led = -1
             if ripple_timer >= random.uniform(0.1, 0.5):
                 ripple_timer = 0
                 keystroke_led = random.randint(0, leds - 1)
-                for i in range(max(0, keystroke_led - 2), min(leds, keystroke_led + 3)):
-                    distance = abs(i - keystroke_led)
-                    boost = ripple_boost // (distance + 1)
-                    led_intensities[i] = min(255, led_intensities[i] + boost)
 
-            for seg in range(leds):
-                if led_intensities[seg] > base_intensity:
-                    led_intensities[seg] = max(base_intensity, led_intensities[seg] - 2)
-                set_color(dev_path, r, g, b, led_intensities[seg], seg*5, seg*5+4)
-
-            if stop_event.is_set():
-                return
-            time.sleep(interval)
+            # One report per run of equal segments instead of one per segment
+            n = _ripple_step(led_intensities, base_intensity, boost_by_distance, keystroke_led, runs)
+            for k in range(0, 3 * n, 3):
+                set_color_fast(fd, r, g, b, int(runs[k + 2]), int(runs[k])*5, int(runs[k + 1])*5+4)
+            frame = _skip_missed(start, frame + 1, interval)
     except Exception as e:
         logger.exception(f"[ripple] error: {e}")
+    finally:
+        close_device(fd)
 
 # --- Animation Controller ---
 class AnimationController(QObject):
@@ -259,19 +499,23 @@ class LogConsole(QDockWidget):
         self.setAllowedAreas(Qt.DockWidgetArea.BottomDockWidgetArea)
         self.view = QPlainTextEdit()
         self.view.setReadOnly(True)
+        self.view.setMaximumBlockCount(5000)
         self.setWidget(self.view)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.flush_logs)
-        self.timer.start(100)
+        log_notifier.lines_pending.connect(self.flush_logs, Qt.ConnectionType.QueuedConnection)
+        # Pick up anything logged before the console existed
+        self.flush_logs()
 
     def flush_logs(self):
-        while True:
+        log_notifier.pending = False
+        lines = []
+        while log_queue:
             try:
-                line = log_queue.get_nowait()
-                self.view.appendPlainText(line)
-            except queue.Empty:
+                lines.append(log_queue.popleft())
+            except IndexError:
                 break
+        if lines:
+            self.view.appendPlainText("\n".join(lines))
 
 # --- Main Window ---
 class SimpleRGBController(QMainWindow):
@@ -298,13 +542,46 @@ class SimpleRGBController(QMainWindow):
 
         # Animator
         self.animator = AnimationController(lambda: self.device_path)
+        self._preview_qss = None
+
+        # Coalesces rapid slider/picker changes into one settings + HID write
+        self._apply_timer = QTimer(self)
+        self._apply_timer.setSingleShot(True)
+        self._apply_timer.setInterval(20)
+        self._apply_timer.timeout.connect(self._commit_color)
+
+        # GUI color writes go through one writer thread; only the latest is kept
+        self._write_q = collections.deque(maxlen=1)
+        self._write_evt = threading.Event()
+        self._writer_stop = False
+        self._writer = threading.Thread(target=self._hid_writer, daemon=True, name="HID-writer")
+        self._writer.start()
 
         self.init_ui()
 
         # Apply saved color
         if self.device_available:
-            disable_autonomous(self.device_path)
-            set_color(self.device_path, *self.current_color, self.current_intensity)
+            self.queue_color(*self.current_color, self.current_intensity)
+
+    def queue_color(self, r, g, b, i):
+        """Hand a static color to the writer thread, replacing any not yet written"""
+        self._write_q.append((self.device_path, r, g, b, i))
+        self._write_evt.set()
+
+    def _hid_writer(self):
+        while True:
+            self._write_evt.wait()
+            self._write_evt.clear()
+            try:
+                dev_path, r, g, b, i = self._write_q.pop()
+            except IndexError:
+                pass
+            else:
+                disable_autonomous(dev_path)
+                set_color(dev_path, r, g, b, i)
+            # A color queued during the last write is still written before exiting
+            if self._writer_stop and not self._write_q:
+                return
 
     def init_ui(self):
         self.setWindowTitle("Keyboard RGB Controller - Simple")
@@ -333,6 +610,8 @@ class SimpleRGBController(QMainWindow):
         preview_layout = QVBoxLayout()
         self.color_preview = QLabel()
         self.color_preview.setMinimumHeight(80)
+        self.color_preview.setAutoFillBackground(True)
+        self._preview_palette = QPalette()
         self.color_preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.update_preview()
         preview_layout.addWidget(self.color_preview)
@@ -367,10 +646,10 @@ class SimpleRGBController(QMainWindow):
         presets_group = QGroupBox("Quick Presets")
         presets_grid = QGridLayout()
         row, col = 0, 0
-        for name, (r, g, b, i) in PRESETS.items():
+        for name, (r, g, b, i, text_color) in PRESETS.items():
             btn = QPushButton(name)
-            btn.setStyleSheet(f"background-color: rgb({r},{g},{b}); color: {'white' if (r+g+b)/3 < 128 else 'black'}; padding: 8px;")
-            btn.clicked.connect(lambda checked=False, n=name: self.apply_preset(n))
+            btn.setStyleSheet(f"background-color: rgb({r},{g},{b}); color: {text_color}; padding: 8px;")
+            btn.clicked.connect(self._on_preset_clicked)
             presets_grid.addWidget(btn, row, col)
             col += 1
             if col >= 3:
@@ -438,59 +717,69 @@ class SimpleRGBController(QMainWindow):
         if color.isValid():
             self.current_color = [color.red(), color.green(), color.blue()]
             self.update_preview()
-            self.persist_state()
-            # Apply immediately
-            if self.device_available:
-                disable_autonomous(self.device_path)
-                set_color(self.device_path, *self.current_color, self.current_intensity)
+            self._apply_timer.start()
 
     def on_brightness_changed(self, value):
         self.current_intensity = value
         self.brightness_value.setText(str(value))
         self.update_preview()
+        self._apply_timer.start()
+
+    def _commit_color(self):
         self.persist_state()
-        # Apply immediately
         if self.device_available:
-            disable_autonomous(self.device_path)
-            set_color(self.device_path, *self.current_color, self.current_intensity)
+            self.queue_color(*self.current_color, self.current_intensity)
 
     def update_preview(self):
         r, g, b = self.current_color
-        factor = self.current_intensity / 255
-        dr, dg, db = int(r * factor), int(g * factor), int(b * factor)
-        color = QColor(dr, dg, db)
-        palette = self.color_preview.palette()
-        palette.setColor(QPalette.ColorRole.Window, color)
-        self.color_preview.setAutoFillBackground(True)
-        self.color_preview.setPalette(palette)
-        text_color = "white" if (r + g + b) / 3 < 128 else "black"
-        self.color_preview.setText(f"RGB({r}, {g}, {b})\\nBrightness: {self.current_intensity}")
-        self.color_preview.setStyleSheet(f"color: {text_color}; font-size: 14px; font-weight: bold; border: 2px solid #333;")
+        i = self.current_intensity
+        self._preview_palette.setColor(QPalette.ColorRole.Window,
+                                       QColor(r * i // 255, g * i // 255, b * i // 255))
+        self.color_preview.setPalette(self._preview_palette)
+        self.color_preview.setText(f"RGB({r}, {g}, {b})\\nBrightness: {i}")
+        # Only re-set (and re-parse) the stylesheet when the text color flips
+        qss = _PREVIEW_QSS_DARK if r + g + b < 384 else _PREVIEW_QSS_LIGHT
+        if qss is not self._preview_qss:
+            self._preview_qss = qss
+            self.color_preview.setStyleSheet(qss)
+
+    def _on_preset_clicked(self):
+        # Shared slot for all preset buttons; the button label is the preset name
+        self.apply_preset(self.sender().text())
 
     def apply_preset(self, name):
-        r, g, b, i = PRESETS[name]
+        r, g, b, i, _ = PRESETS[name]
         self.current_color = [r, g, b]
         self.current_intensity = i
         self.brightness_slider.setValue(i)
         self.update_preview()
         self.persist_state()
         if self.device_available:
-            disable_autonomous(self.device_path)
-            set_color(self.device_path, r, g, b, i)
+            self.queue_color(r, g, b, i)
+        # Already queued above; drop the commit scheduled by setValue()
+        self._apply_timer.stop()
+
+    def _drop_pending_commit(self):
+        """Keep a queued color write from landing on top of an animation or Stop"""
+        if self._apply_timer.isActive():
+            self._apply_timer.stop()
+            self.persist_state()
+        self._write_q.clear()
 
     def apply_lighting(self):
         if not self.device_available:
             QMessageBox.warning(self, "Error", "Device not found")
             return
+        self._drop_pending_commit()
         style = self.style_combo.currentText()
         interval = self.speed_slider.value() / 100
         self.animator.start(style, tuple(self.current_color), interval)
 
     def stop_animation(self):
+        self._drop_pending_commit()
         self.animator.stop()
         if self.device_available:
-            disable_autonomous(self.device_path)
-            set_color(self.device_path, 0, 0, 0, 0)
+            self.queue_color(0, 0, 0, 0)
 
     def persist_state(self):
         r, g, b = self.current_color
@@ -500,12 +789,20 @@ class SimpleRGBController(QMainWindow):
         self.settings.setValue("intensity", self.current_intensity)
         self.settings.setValue("device_path", self.device_path)
         self.settings.setValue("speed_slider", self.speed_slider.value())
-        self.settings.sync()
         logger.debug(f"Settings saved: RGB({r},{g},{b}) I={self.current_intensity}")
 
     def closeEvent(self, event):
         logger.info("Closing GUI - animations will continue in background")
+        # Flush a color still waiting on the debounce timer
+        if self._apply_timer.isActive():
+            self._apply_timer.stop()
+            self._commit_color()
         self.persist_state()
+        self.settings.sync()
+        # Let the writer finish the last queued color, then exit
+        self._writer_stop = True
+        self._write_evt.set()
+        self._writer.join(timeout=1.0)
         # DON'T stop animations - let them continue
         event.accept()
 
@@ -6,11 +6,17 @@ import time
 import math
 import threading
 import logging
+from logging.handlers import QueueHandler, QueueListener
 import queue
+import collections
+import atexit
 import argparse
 import json
 import signal
+import errno
+import stat
 from pathlib import Path
+from contextlib import contextmanager
 from enum import IntEnum
 from typing import Optional, Tuple
 
@@ -19,8 +25,12 @@ from PyQt6.QtWidgets import (
     QPushButton, QSlider, QLabel, QComboBox, QGroupBox, QGridLayout,
     QMessageBox, QPlainTextEdit, QDockWidget, QCheckBox, QFrame, QLineEdit
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject, QSettings, QPointF, QSize
-from PyQt6.QtGui import QColor, QPalette, QPainter, QConicalGradient, QPen, QDoubleValidator
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject, QSettings, QPointF, QSize, QSignalBlocker
+from PyQt6.QtGui import QColor, QPalette, QPainter, QConicalGradient, QRadialGradient, QPen, QDoubleValidator, QPixmap, QImage
+
+# Optional: render the color wheel as a true HSV disc when numpy is installed
+try: import numpy as np
+except ImportError: np = None
 
 # --- Config ---
 APP_NAME = "kbdrgb"
@@ -28,52 +38,147 @@ ORG_NAME = "kbdrgb"
 DEFAULT_DEVICE_PATH = os.environ.get("KBDRGB_HID", "/dev/hidraw1")
 
 # --- Logging ---
-log_queue = queue.Queue(maxsize=1000)
-class QueueHandler(logging.Handler):
-    def emit(self, record):
-        try: log_queue.put_nowait(self.format(record))
-        except queue.Full: pass
+# Callers only enqueue records; a QueueListener thread formats them into log_queue for the console
+record_queue = queue.SimpleQueue()
+log_queue = collections.deque(maxlen=1000)  # single producer (listener) / single consumer (console); full drops the oldest
+class ConsoleQueueHandler(logging.Handler):
+    def emit(self, record): log_queue.append(self.format(record))
 
 logger = logging.getLogger("kbdrgb")
 logger.setLevel(logging.INFO)
-handler = QueueHandler(); handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s", "%H:%M:%S"))
-logger.addHandler(handler)
+handler = ConsoleQueueHandler(); handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s", "%H:%M:%S"))
+logger.addHandler(QueueHandler(record_queue))
+log_listener = QueueListener(record_queue, handler); log_listener.start(); atexit.register(log_listener.stop)
 
 # --- HID Communication ---
 def HIDIOCSFEATURE(length): return 0xC0004806 | (length << 16)
+_HIDIOC_SF_10 = HIDIOCSFEATURE(10); _HIDIOC_SF_2 = HIDIOCSFEATURE(2)  # SET_COLOR, DISABLE_AUTONOMOUS
+_HIDIOC_CACHE = {10: _HIDIOC_SF_10, 2: _HIDIOC_SF_2}
+_PKT_DISABLE = b'\x0b\x00'  # DISABLE_AUTONOMOUS never changes; immutable so it can sit in the queue
+
+class HidWorker(threading.Thread):
+    """Owns the hidraw fd and performs every ioctl off the GUI thread.
+    Colors are latest-wins (a newer one replaces one not yet sent); other reports are sent in order.
+    Animation colors carry the generation they were started in; bumping it drops any later post from an old run."""
+    def __init__(self, dev_path):
+        super().__init__(daemon=True, name="HidWorker")
+        self.dev_path = dev_path; self._fd = None
+        self._cv = threading.Condition(); self._control = []; self._latest: Optional[tuple] = None; self._busy = False
+        self._last_color: Optional[tuple] = None  # last (r, g, b, i) that reached the device
+        self._gen = 0  # animation run generation, only changed under _cv
+        # Full-range SET_COLOR report; only this thread touches it, rewriting r, g, b, i in place
+        self._color_pkt = bytearray(b'\x05\x01\x00\x00\x64\x00\x00\x00\x00\x00')
+
+    def post(self, packet, request=None):
+        with self._cv: self._control.append((packet, request)); self._cv.notify()
+
+    def post_color(self, rgbi, gen=None):
+        # gen=None (GUI/CLI colors) always lands; a stale generation is dropped under the same lock new_generation() takes
+        with self._cv:
+            if gen is not None and gen != self._gen: return False
+            self._latest = rgbi; self._cv.notify(); return True
+
+    def new_generation(self):
+        with self._cv: self._gen += 1; return self._gen
+
+    def drain(self, timeout=1.0):
+        # Block until everything posted so far has been written (used before exiting)
+        with self._cv: return self._cv.wait_for(lambda: not (self._busy or self._control or self._latest), timeout)
+
+    def run(self):
+        while True:
+            with self._cv:
+                self._cv.wait_for(lambda: self._control or self._latest)
+                control, self._control = self._control, []
+                latest, self._latest = self._latest, None; self._busy = True
+            for packet, request in control:
+                self._last_color = None  # a mode change may alter what the LEDs show
+                if self._ioctl(packet, request): time.sleep(0.01)  # let the controller switch modes
+            if latest is not None and latest != self._last_color:
+                pkt = self._color_pkt; pkt[6], pkt[7], pkt[8], pkt[9] = latest
+                self._last_color = latest if self._ioctl(pkt, _HIDIOC_SF_10) else None
+            with self._cv: self._busy = False; self._cv.notify_all()
+
+    # ioctl errors that mean the node behind our fd is gone (unplug, suspend); anything else keeps the fd
+    _STALE_FD_ERRNOS = (errno.ENODEV, errno.ENXIO, errno.EBADF)
+
+    def _open(self):
+        fd = os.open(self.dev_path, os.O_RDWR)
+        # Checked once per open rather than stat()ing the path before every write
+        if not stat.S_ISCHR(os.fstat(fd).st_mode):
+            os.close(fd); raise OSError(errno.ENOTTY, "not a hidraw character device", self.dev_path)
+        self._fd = fd
+
+    def _close(self):
+        try: os.close(self._fd)
+        except OSError: pass
+        self._fd = None  # reopen on the next write
+
+    def _ioctl(self, packet, request=None):
+        try:
+            if self._fd is None: self._open()
+            if request is None: n = len(packet); request = _HIDIOC_CACHE.get(n) or HIDIOCSFEATURE(n)
+            fcntl.ioctl(self._fd, request, packet); return True
+        except FileNotFoundError: return False  # device not present; same quiet failure as before
+        except OSError as e:
+            logger.error(f"HID Error: {e}")
+            if self._fd is not None and e.errno in self._STALE_FD_ERRNOS: self._close()
+            return False
+
+_hid_workers = {}; _hid_workers_lock = threading.Lock()
+def hid_worker(dev_path) -> HidWorker:
+    with _hid_workers_lock:
+        worker = _hid_workers.get(dev_path)
+        if worker is None: worker = _hid_workers[dev_path] = HidWorker(dev_path); worker.start()
+        return worker
+
 def send_feature_report(dev_path, report_id, data):
-    if not os.path.exists(dev_path): return False
-    logger.info(f"SHELL CMD: hid-feature-report --device {dev_path} --report-id {report_id} --data {' '.join(f'{b:02x}' for b in data)}")
     packet = bytes([report_id]) + bytes(data)
-    try:
-        with open(dev_path, 'rb+') as fd: fcntl.ioctl(fd, HIDIOCSFEATURE(len(packet)), packet)
-        return True
-    except (OSError, IOError) as e: logger.error(f"HID Error: {e}"); return False
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("SHELL CMD: hid-feature-report --device %s --report-id %d --data %s", dev_path, report_id, packet[1:].hex(' '))
+    hid_worker(dev_path).post(packet)
+    return True
 
-def disable_autonomous(dev_path): send_feature_report(dev_path, 0x0B, [0x00]); time.sleep(0.01)
-def set_color(dev_path, r, g, b, i):
-    return send_feature_report(dev_path, 0x05, [0x01, 0, 0, 100, 0, int(r), int(g), int(b), int(i)])
+def disable_autonomous(dev_path):
+    if logger.isEnabledFor(logging.DEBUG): logger.debug("SHELL CMD: hid-feature-report --device %s --report-id 11 --data 00", dev_path)
+    hid_worker(dev_path).post(_PKT_DISABLE, _HIDIOC_SF_2)
+def set_color(dev_path, r, g, b, i, gen=None):
+    # Latest-wins full-range SET_COLOR; the worker fills its prebuilt report in place
+    r, g, b, i = int(r), int(g), int(b), int(i)
+    if (r | g | b | i) & ~0xFF: raise ValueError("bytes must be in range(0, 256)")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("SHELL CMD: hid-feature-report --device %s --report-id 5 --data 01 00 00 64 00 %02x %02x %02x %02x", dev_path, r, g, b, i)
+    return hid_worker(dev_path).post_color((r, g, b, i), gen)
 
 # --- Animation Logic (Reworked for Live Updates) ---
-def breathing(dev_path, param_provider, stop_event):
+BREATH_STEPS = 180
+# Raised-cosine breathing curve in Q10 fixed point: level = (BREATH_PHASE[k] * intensity) >> 10
+BREATH_PHASE = tuple(round(((1 - math.cos(k * 2 * math.pi / BREATH_STEPS)) / 2) * 1024) for k in range(BREATH_STEPS))
+
+def breathing(dev_path, param_provider, stop_event, params_changed, gen=None):
     logger.info("Animation started: Breathing")
     disable_autonomous(dev_path)
+    last = None  # (r, g, b, level) last sent; flat parts of the curve repeat it
     while not stop_event.is_set():
-        color, interval, intensity = param_provider()
+        params_changed.clear(); color, interval, intensity = param_provider()
         r, g, b = color
-        t0 = time.monotonic()
-        for k in range(180):
-            if stop_event.is_set(): break
-            # Check for parameter changes mid-cycle for responsiveness
-            new_color, new_interval, new_intensity = param_provider()
-            if new_interval != interval: interval = new_interval; break
-            if new_color != (r,g,b): r,g,b = new_color
-            if new_intensity != intensity: intensity = new_intensity
-            
-            phase = (1 - math.cos(k * 2 * math.pi / 180)) / 2
-            set_color(dev_path, r, g, b, int(phase * intensity))
-            target = t0 + (k + 1) * (interval / 180)
-            time.sleep(max(0.0, target - time.monotonic()))
+        t0 = time.monotonic(); step = max(interval, 0.01) * (1.0 / BREATH_STEPS)  # same 0.01 s floor as the slider/validator
+        k = 0
+        while k < BREATH_STEPS:
+            frame = (r, g, b, (BREATH_PHASE[k] * intensity) >> 10)
+            if stop_event.is_set(): break  # cheap early exit; the generation check below is what makes stop() race-free
+            if frame != last:
+                if not set_color(dev_path, *frame, gen): break  # stop() bumped the generation: this run is stale
+                last = frame
+            k += 1; remaining = t0 + k * step - time.monotonic()
+            # More than a frame behind (stalled write, scheduler hiccup): drop the missed frames rather than burst them
+            if remaining < -step: k += int(-remaining / step); continue
+            # Sleep until the next frame, waking early if params change (or stop() is called)
+            if params_changed.wait(max(0.0, remaining)):
+                if stop_event.is_set(): break
+                params_changed.clear(); new_color, new_interval, new_intensity = param_provider()
+                if new_interval != interval: break  # restart the cycle at the new speed
+                (r, g, b), intensity = new_color, new_intensity
     logger.info("Animation stopped: Breathing")
 
 class AnimationController(QObject):
@@ -81,17 +186,27 @@ class AnimationController(QObject):
         super().__init__()
         self.device_path = dev_path
         self.thread = None; self.stop_event = threading.Event(); self.current_style = "Static"
-        self._lock = threading.Lock()
-        self._params = {'color': (255,0,0), 'interval': 0.5, 'intensity': 255}
+        self.hid = hid_worker(dev_path); self._gen = self.hid.new_generation()
+        self._lock = threading.Lock(); self._params_changed = threading.Event()
+        # Immutable (color, interval, intensity) snapshot, swapped whole: readers never lock, and any
+        # number of updates between two animation wakeups collapse into the one snapshot it reads
+        self._params = ((255,0,0), 0.5, 255)
 
-    def get_params(self):
-        with self._lock: return self._params['color'], self._params['interval'], self._params['intensity']
+    def get_params(self): return self._params
     
-    def update_params(self, **kwargs):
-        with self._lock: self._params.update(kwargs)
+    def update_params(self, color=None, interval=None, intensity=None):
+        with self._lock:  # serialize writers only (read-modify-write of the tuple)
+            c, iv, it = self._params
+            self._params = (c if color is None else tuple(color), iv if interval is None else interval, it if intensity is None else intensity)
+        self._params_changed.set()
 
     def start(self, style, color, interval, intensity):
-        self.stop(); self.stop_event.clear()
+        if style == self.current_style and self.thread and self.thread.is_alive():
+            # Same animation already running: hand it the new params instead of restarting the thread
+            self.update_params(color=color, interval=interval, intensity=intensity); return
+        self.stop()
+        # Fresh events per run, so a thread that is still winding down can't be revived or steal a wakeup
+        self.stop_event = threading.Event(); self._params_changed = threading.Event()
         self.current_style = style
         self.update_params(color=color, interval=interval, intensity=intensity)
         
@@ -100,35 +215,87 @@ class AnimationController(QObject):
             return
         
         if style.lower() == "breathing":
-            self.thread = threading.Thread(target=breathing, args=(self.device_path, self.get_params, self.stop_event), daemon=False)
+            self.thread = threading.Thread(target=breathing, args=(self.device_path, self.get_params, self.stop_event, self._params_changed, self._gen), daemon=False)
             self.thread.start()
         else:
              logger.warning(f"Animation '{style}' not implemented for live updates yet.")
              set_color(self.device_path, *color, intensity) # Fallback to static
 
-    def stop(self):
+    def stop(self, timeout=0.0):
+        # Signal the thread and return; it exits on its own. Only shutdown passes a (short) timeout to wait for it.
+        # Bumping the generation first makes the worker drop any frame the old thread posts after this point,
+        # so a color set right after stop() can't be overwritten without joining.
+        self._gen = self.hid.new_generation()
         if self.thread and self.thread.is_alive():
-            self.stop_event.set(); self.thread.join(timeout=1.0)
-        self.current_style = "Static"; disable_autonomous(self.device_path)
+            self.stop_event.set(); self._params_changed.set()
+            if timeout: self.thread.join(timeout)
+        self.thread = None; self.current_style = "Static"; disable_autonomous(self.device_path)
 
 # --- UI Components ---
+@contextmanager
+def signals_blocked(*widgets):
+    # QSignalBlocker restores each widget's previous state, so nesting doesn't unblock a widget early
+    blockers = [QSignalBlocker(w) for w in widgets]
+    try: yield
+    finally:
+        for b in blockers: b.unblock()
+
+def hsv_disc_image(width, height, cx, cy, radius, v) -> QImage:
+    """HSV wheel as an RGBA image: hue by angle (0 at the top, counter-clockwise), saturation by radius"""
+    ys, xs = np.indices((height, width), dtype=np.float32) + 0.5
+    dx, dy = xs - cx, ys - cy; dist = np.hypot(dx, dy)
+    h6 = ((np.degrees(np.arctan2(-dy, dx)) - 90) % 360) / 60; s = np.minimum(dist / radius, 1.0)
+    sector = h6.astype(np.int32) % 6; f = h6 - np.floor(h6)
+    p, q, t = v * (1 - s), v * (1 - s * f), v * (1 - s * (1 - f)); vv = np.full_like(s, v)
+    img = np.empty((height, width, 4), dtype=np.uint8)
+    for ch, opts in enumerate(((vv, q, p, p, t, vv), (t, vv, vv, q, p, p), (p, p, t, vv, vv, q))):
+        img[..., ch] = np.choose(sector, opts) * 255 + 0.5
+    img[..., 3] = np.clip(radius - dist + 0.5, 0, 1) * 255  # antialiased edge
+    return QImage(img.data, width, height, 4 * width, QImage.Format.Format_RGBA8888).copy()  # copy: own the pixels
+
 class ColorWheel(QFrame):
     colorChanged = pyqtSignal(QColor)
     def __init__(self, parent=None):
         super().__init__(parent); self.setMinimumSize(250, 250); self.setCursor(Qt.CursorShape.CrossCursor)
         self.h, self.s, self.v = 0.0, 1.0, 1.0
+        self._wheel_key = None; self._wheel_pixmap = None; self._update_geometry()
+    def _update_geometry(self):
+        # Wheel center and radius, shared by painting, hit-testing and the pixmap cache
+        self._cx, self._cy, self._radius = self.rect().center().x(), self.rect().center().y(), min(self.width(), self.height()) / 2 - 10
+    def resizeEvent(self, e): self._update_geometry(); super().resizeEvent(e)
+    def _wheel(self):
+        # The hue ring only depends on size and value; render it once into a pixmap and blit it on repaint
+        dpr = self.devicePixelRatioF(); key = (self.width(), self.height(), dpr, self.v)
+        if key != self._wheel_key:
+            w, h = round(self.width() * dpr), round(self.height() * dpr)
+            cx, cy, r = self._cx, self._cy, self._radius
+            if np is not None:
+                # One vectorized pass over the pixel grid, in device pixels
+                pm = QPixmap.fromImage(hsv_disc_image(w, h, cx * dpr, cy * dpr, r * dpr, self.v)); pm.setDevicePixelRatio(dpr)
+            else:
+                pm = QPixmap(w, h); pm.setDevicePixelRatio(dpr); pm.fill(Qt.GlobalColor.transparent)
+                p = QPainter(pm); p.setRenderHint(QPainter.RenderHint.Antialiasing)
+                grad = QConicalGradient(QPointF(cx, cy), 90)
+                # HSV->RGB is linear in hue between 60° breakpoints, so 10° stops interpolate exactly
+                for i in range(37): grad.setColorAt(i/36., QColor.fromHsvF((i % 36)/36., 1.0, self.v))
+                p.setBrush(grad); p.drawEllipse(QPointF(cx, cy), r, r)
+                # Then saturation by radius, matching the numpy disc and _update_pos: at fixed h and v, HSV->RGB is
+                # linear in s, so gray(v) fading from opaque at the center to transparent at the rim is exact
+                gray = QColor.fromHsvF(0.0, 0.0, self.v); rim = QColor(gray); rim.setAlphaF(0.0)
+                fade = QRadialGradient(QPointF(cx, cy), r); fade.setColorAt(0.0, gray); fade.setColorAt(1.0, rim)
+                p.setPen(Qt.PenStyle.NoPen); p.setBrush(fade); p.drawEllipse(QPointF(cx, cy), r, r); p.end()
+            self._wheel_key, self._wheel_pixmap = key, pm
+        return self._wheel_pixmap
     def paintEvent(self, e):
         p = QPainter(self); p.setRenderHint(QPainter.RenderHint.Antialiasing)
-        cx, cy, r = self.rect().center().x(), self.rect().center().y(), min(self.width(), self.height()) / 2 - 10
-        grad = QConicalGradient(QPointF(cx, cy), 90)
-        for i in range(361): grad.setColorAt(i/360., QColor.fromHsvF(i/360., 1.0, self.v))
-        p.setBrush(grad); p.drawEllipse(QPointF(cx, cy), r, r)
+        cx, cy, r = self._cx, self._cy, self._radius
+        p.drawPixmap(0, 0, self._wheel())
         angle = 2 * math.pi * self.h + math.pi/2; ix, iy = cx + r * self.s * math.cos(angle), cy - r * self.s * math.sin(angle)
         p.setPen(QPen(Qt.GlobalColor.white, 2)); p.setBrush(self.get_color()); p.drawEllipse(QPointF(ix, iy), 8, 8)
     def mouseMoveEvent(self, e): self._update_pos(e.position())
     def mousePressEvent(self, e): self._update_pos(e.position())
     def _update_pos(self, pos):
-        cx, cy, r = self.rect().center().x(), self.rect().center().y(), min(self.width(), self.height())/2-10
+        cx, cy, r = self._cx, self._cy, self._radius
         dx, dy = pos.x()-cx, pos.y()-cy; dist = math.hypot(dx, dy)
         if dist > r: return
         self.h = (math.degrees(math.atan2(-dy, dx)) - 90) % 360 / 360.; self.s = dist / r
@@ -142,10 +309,16 @@ class ColorWheel(QFrame):
 class LogConsole(QDockWidget):
     def __init__(self, parent=None):
         super().__init__("Logs", parent); self.setAllowedAreas(Qt.DockWidgetArea.LeftDockWidgetArea | Qt.DockWidgetArea.RightDockWidgetArea)
-        self.view = QPlainTextEdit(); self.view.setReadOnly(True); self.setWidget(self.view)
+        self.view = QPlainTextEdit(); self.view.setReadOnly(True); self.view.setMaximumBlockCount(5000); self.setWidget(self.view)
         self.timer = QTimer(self); self.timer.timeout.connect(self.flush); self.timer.start(100)
+    MAX_LINES_PER_FLUSH = 200  # under a log storm the rest waits for the next tick
     def flush(self):
-        while not log_queue.empty(): self.view.appendPlainText(log_queue.get_nowait())
+        lines = []
+        while log_queue and len(lines) < self.MAX_LINES_PER_FLUSH: lines.append(log_queue.popleft())
+        if not lines: return
+        self.view.setUpdatesEnabled(False)
+        try: self.view.appendPlainText("\n".join(lines))
+        finally: self.view.setUpdatesEnabled(True)
 
 class MainAppWindow(QMainWindow):
     def __init__(self):
@@ -153,6 +326,11 @@ class MainAppWindow(QMainWindow):
         self.settings = QSettings(ORG_NAME, APP_NAME)
         self.device_path = self.settings.value("device_path", DEFAULT_DEVICE_PATH, str)
         self.animator = AnimationController(self.device_path)
+        # Live drags only record the latest state; one timer tick writes it out (~100 Hz max)
+        self._pending: Optional[tuple] = None; self._pending_restart = False
+        self._flush_timer = QTimer(self); self._flush_timer.setSingleShot(True); self._flush_timer.setInterval(10); self._flush_timer.timeout.connect(self._flush_pending)
+        # Brightness drags during an animation forward at most one update per frame (~60 Hz)
+        self._intensity_throttle = QTimer(self); self._intensity_throttle.setSingleShot(True); self._intensity_throttle.setInterval(16); self._intensity_throttle.timeout.connect(self._flush_intensity)
         self._build_ui(); self.load_settings()
 
     def _build_ui(self):
@@ -167,7 +345,7 @@ class MainAppWindow(QMainWindow):
         self.slider = QSlider(Qt.Orientation.Horizontal); self.slider.setRange(0, 255)
         self.slider_label = QLabel(); slider_layout.addWidget(self.slider); slider_layout.addWidget(self.slider_label)
         self.slider.valueChanged.connect(self.slider_label.setNum)
-        self.slider.valueChanged.connect(self.live_update_intensity)
+        self.slider.valueChanged.connect(self.live_update_intensity); self.slider.sliderReleased.connect(self._on_slider_released)
         wheel_layout.addLayout(slider_layout); layout.addWidget(wheel_group)
 
         anim_group = QGroupBox("Animation"); anim_layout = QVBoxLayout(anim_group)
@@ -175,7 +353,7 @@ class MainAppWindow(QMainWindow):
         anim_layout.addWidget(self.style_combo)
         speed_layout = QHBoxLayout(); speed_layout.addWidget(QLabel("Slow")); self.speed_slider = QSlider(Qt.Orientation.Horizontal); self.speed_slider.setRange(0, 100); speed_layout.addWidget(self.speed_slider); speed_layout.addWidget(QLabel("Fast"))
         self.speed_input = QLineEdit(); self.speed_input.setValidator(QDoubleValidator(0.01, 30.0, 2)); speed_layout.addWidget(self.speed_input)
-        self.speed_slider.valueChanged.connect(self.live_update_interval_from_slider)
+        self.speed_slider.valueChanged.connect(self.live_update_interval_from_slider); self.speed_slider.sliderReleased.connect(self._on_speed_released)
         self.speed_input.editingFinished.connect(self.live_update_interval_from_input)
         anim_layout.addLayout(speed_layout); layout.addWidget(anim_group)
 
@@ -189,47 +367,72 @@ class MainAppWindow(QMainWindow):
     
     def load_settings(self):
         c = QColor(*[self.settings.value(f"color_{k}", v, int) for k,v in zip("rgb",[0,0,255])]); i = self.settings.value("intensity", 255, int); interval = self.settings.value("speed_interval", 0.5, float)
-        self.wheel.blockSignals(True); self.slider.blockSignals(True); self.speed_slider.blockSignals(True); self.speed_input.blockSignals(True)
-        self.slider.setValue(i); self.wheel.set_color(c); self.speed_input.setText(f"{interval:.2f}"); self.speed_slider.setValue(self._interval_to_slider(interval))
-        self.wheel.blockSignals(False); self.slider.blockSignals(False); self.speed_slider.blockSignals(False); self.speed_input.blockSignals(False)
-        self.animator.start("Static", [c.red(),c.green(),c.blue()], interval, i) # Start in static mode
+        central = self.centralWidget(); central.setUpdatesEnabled(False)
+        try:
+            with signals_blocked(self.wheel, self.slider, self.speed_slider, self.speed_input):
+                self.slider.setValue(i); self.wheel.set_color(c); self.speed_input.setText(f"{interval:.2f}"); self.speed_slider.setValue(self._interval_to_slider(interval))
+        finally: central.setUpdatesEnabled(True); central.update()
+        # Start in static mode once the event loop runs, so the window shows before any HID traffic
+        QTimer.singleShot(0, lambda: self.animator.start("Static", [c.red(),c.green(),c.blue()], interval, i))
+
+    def _schedule_flush(self):
+        if not self._flush_timer.isActive(): self._flush_timer.start()
+
+    def _flush_pending(self):
+        pending, self._pending = self._pending, None
+        restart, self._pending_restart = self._pending_restart, False
+        if restart: self.apply_animation_style()
+        elif pending is not None: set_color(self.device_path, *pending)
 
     def live_update_color(self, color: QColor):
         if self.animator.current_style.lower() == "static":
-            set_color(self.device_path, color.red(), color.green(), color.blue(), self.slider.value())
+            self._pending = (color.red(), color.green(), color.blue(), self.slider.value()); self._schedule_flush()
         else: self.animator.update_params(color=(color.red(), color.green(), color.blue()))
 
     def live_update_intensity(self, value):
         c = self.wheel.get_color()
         if self.animator.current_style.lower() == "static":
-            set_color(self.device_path, c.red(), c.green(), c.blue(), value)
-        else: self.animator.update_params(intensity=value)
+            self._pending = (c.red(), c.green(), c.blue(), value); self._schedule_flush()
+        elif not self._intensity_throttle.isActive(): self._intensity_throttle.start()
+
+    def _flush_intensity(self): self.animator.update_params(intensity=self.slider.value())
+    def _on_slider_released(self):
+        # The released value always goes through, even mid-throttle
+        if self._intensity_throttle.isActive(): self._intensity_throttle.stop(); self._flush_intensity()
             
     def live_update_interval_from_slider(self, value):
         interval = self._slider_to_interval(value)
-        self.speed_input.blockSignals(True); self.speed_input.setText(f"{interval:.2f}"); self.speed_input.blockSignals(False)
-        if self.animator.current_style.lower() != "static": self.apply_animation_style()
+        with QSignalBlocker(self.speed_input): self.speed_input.setText(f"{interval:.2f}")
+        if self.animator.current_style.lower() != "static":
+            # Restarting the animation per drag step is wasteful; restart once on release
+            self._pending_restart = True
+            if not self.speed_slider.isSliderDown(): self._schedule_flush()
+
+    def _on_speed_released(self):
+        if self._pending_restart: self._schedule_flush()
 
     def live_update_interval_from_input(self):
         interval = float(self.speed_input.text())
-        self.speed_slider.blockSignals(True); self.speed_slider.setValue(self._interval_to_slider(interval)); self.speed_slider.blockSignals(False)
+        with QSignalBlocker(self.speed_slider): self.speed_slider.setValue(self._interval_to_slider(interval))
         if self.animator.current_style.lower() != "static": self.apply_animation_style()
 
     def apply_animation_style(self):
+        self._flush_timer.stop(); self._pending = None; self._pending_restart = False
         c = self.wheel.get_color()
         self.animator.start(self.style_combo.currentText(), (c.red(), c.green(), c.blue()), float(self.speed_input.text()), self.slider.value())
 
     def save_and_exit(self):
+        self._flush_timer.stop(); self._pending = None
         self.animator.stop(); c = self.wheel.get_color(); i = self.slider.value()
         set_color(self.device_path, c.red(), c.green(), c.blue(), i)
         self.settings.setValue("color_r", c.red()); self.settings.setValue("color_g", c.green()); self.settings.setValue("color_b", c.blue())
         self.settings.setValue("intensity", i); self.settings.setValue("speed_interval", float(self.speed_input.text()))
         logger.info("Settings saved."); self.close()
 
-    def stop_and_off(self): self.animator.stop(); set_color(self.device_path, 0, 0, 0, 0)
+    def stop_and_off(self): self._flush_timer.stop(); self._pending = None; self.animator.stop(); set_color(self.device_path, 0, 0, 0, 0)
     def _slider_to_interval(self, v): return max(0.01, min(30.0, 10 ** (1.0 - 0.03 * v)))
     def _interval_to_slider(self, i): return int(round((1.0 - math.log10(max(0.01, min(30.0, i)))) / 0.03))
-    def closeEvent(self, e): self.animator.stop(); super().closeEvent(e)
+    def closeEvent(self, e): self.animator.stop(timeout=0.2); self.animator.hid.drain(); super().closeEvent(e)
     def apply_dark_theme(self):
         p = QPalette(); p.setColor(QPalette.ColorRole.Window, QColor(53,53,53)); p.setColor(QPalette.ColorRole.WindowText, Qt.GlobalColor.white)
         p.setColor(QPalette.ColorRole.Base, QColor(25,25,25)); p.setColor(QPalette.ColorRole.AlternateBase, QColor(53,53,53))
@@ -265,14 +468,19 @@ def handle_cli(args):
     brightness = args.brightness if args.brightness is not None else 255
     speed = args.speed if args.speed is not None else 0.5
 
+    if args.mode.lower() != "breathing":
+        # Static (and anything without an animation): one report, no animation thread.
+        # Leave autonomous mode first (as stop() does for the GUI); the worker sends it ahead of the color.
+        disable_autonomous(device_path); set_color(device_path, *color, brightness)
+        animator.hid.drain() # Let the HID worker send the command
+        return
+
     animator.start(args.mode, color, speed, brightness)
-    # The script should exit after setting the mode.
-    # For animations, a separate mechanism would be needed to keep it running.
-    # For now, we assume that for CLI, we set the mode and exit.
-    # Breathing animation will stop because the main thread exits.
-    # This is a limitation we'll address if needed.
-    time.sleep(0.1) # Give it a moment to send the command
-    sys.exit(0)
+    thread = animator.thread  # stop() clears animator.thread, keep our own handle to join
+    # Run the animation in the foreground until Ctrl-C; the handler only signals, join() returns once the loop exits
+    signal.signal(signal.SIGINT, lambda *_: animator.stop())
+    thread.join()
+    animator.hid.drain()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file